@@ -3,8 +3,10 @@ Pydantic models for the Accounts API.
 """
 
 from enum import Enum
+from typing import Dict
+from uuid import UUID
 
-from pydantic import UUID4, BaseModel, Field
+from pydantic import BaseModel, Field
 
 
 class AccountType(str, Enum):
@@ -21,27 +23,38 @@ class ErrorCode(str, Enum):
     NOT_FOUND = "NOT_FOUND"
     INSUFFICIENT_FUNDS = "INSUFFICIENT_FUNDS"
     INVALID_INPUT = "INVALID_INPUT"
+    SERVICE_UNAVAILABLE = "SERVICE_UNAVAILABLE"
 
 
 class Account(BaseModel):
     """Account model representing a bank account"""
 
-    account_id: UUID4
+    # Version 4 by default, version 7 when time-ordered IDs are enabled.
+    account_id: UUID
     type: AccountType
     balance: float
 
 
+class AccountAggregates(BaseModel):
+    """Summary totals across all accounts"""
+
+    total_balance: float
+    count: int
+    count_by_type: Dict[AccountType, int]
+    balance_by_type: Dict[AccountType, float]
+
+
 class CreateAccountRequest(BaseModel):
     """Request model for creating a new account"""
 
     type: AccountType
-    initial_balance: float = Field(ge=0)
+    initial_balance: float = Field(ge=0, allow_inf_nan=False)
 
 
 class UpdateBalanceRequest(BaseModel):
     """Request model for updating an account balance"""
 
-    amount: float
+    amount: float = Field(allow_inf_nan=False)
 
 
 class ErrorResponse(BaseModel):
@@ -2,21 +2,177 @@
 API routes for the Accounts Service.
 """
 
-from typing import List
-from uuid import UUID
+import json
+from typing import Annotated, Any, Dict, List, NoReturn, Optional
 
-from fastapi import APIRouter, HTTPException, Path, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, status
+from fastapi.exceptions import RequestValidationError
+from pydantic import PlainValidator, TypeAdapter, ValidationError, WithJsonSchema
+from pydantic_core import PydanticCustomError
+from starlette.concurrency import run_in_threadpool
 
 from accounts.api.models import (
     Account,
+    AccountAggregates,
     CreateAccountRequest,
     ErrorCode,
     ErrorResponse,
     UpdateBalanceRequest,
 )
-from accounts.services.account import account_service
+from accounts.services.account import ServiceDrainingError, account_service
+from accounts.services.ids import format_account_id, parse_account_id
+from accounts.tracing import TracedRoute, mark_validated
 
-router = APIRouter(prefix="/accounts", tags=["accounts"])
+
+def _validate_account_id(value: str) -> bytes:
+    """Parse a path account ID, failing with pydantic's UUID error type."""
+    try:
+        return parse_account_id(value)
+    except ValueError as e:
+        raise PydanticCustomError(
+            "uuid_parsing", "Input should be a valid UUID, {error}", {"error": str(e)}
+        )
+
+
+# Account IDs in the path are parsed straight to the 16-byte storage key.
+AccountIdPath = Annotated[
+    bytes,
+    PlainValidator(_validate_account_id),
+    WithJsonSchema({"type": "string", "format": "uuid"}),
+]
+
+_account_id_adapter = TypeAdapter(AccountIdPath)
+_update_balance_adapter = TypeAdapter(UpdateBalanceRequest)
+
+MODEL_ATTRIBUTES_MSG = (
+    "Input should be a valid dictionary or object to extract fields from"
+)
+
+# The debit/credit bodies are decoded by read_update_amount rather than by
+# FastAPI, so the request body has to be documented by hand.
+UPDATE_BALANCE_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": UpdateBalanceRequest.model_json_schema()}
+        },
+    }
+}
+
+
+async def read_update_amount(request: Request) -> float:
+    """Decode the ``amount`` of a debit/credit body straight from raw bytes.
+
+    pydantic-core parses and validates the bytes in one pass, skipping
+    ``json.loads`` and the intermediate dict. Bodies pydantic-core cannot parse
+    are retried with ``json.loads``. Used as a dependency, so like FastAPI it
+    runs before the path is validated: unparseable bodies fail on their own,
+    while other body errors are reported together with any path errors.
+    """
+    body = await request.body()
+    if not body:
+        _raise_body_errors(request, [_missing_body()])
+    if not _is_json(request.headers.get("content-type")):
+        _raise_body_errors(
+            request,
+            [
+                {
+                    "type": "model_attributes_type",
+                    "loc": ("body",),
+                    "msg": MODEL_ATTRIBUTES_MSG,
+                    "input": body.decode("utf-8", "replace"),
+                }
+            ],
+        )
+    try:
+        return _update_balance_adapter.validate_json(body).amount
+    except ValidationError as e:
+        if not any(error["type"] == "json_invalid" for error in e.errors()):
+            _raise_body_errors(request, _body_errors(e))
+    return _read_amount_with_json(request, body)
+
+
+def _read_amount_with_json(request: Request, body: bytes) -> float:
+    """Decode a body pydantic-core rejected the way FastAPI itself would.
+
+    ``json.loads`` also accepts UTF-16 and UTF-32 bodies, reports the offset
+    of a syntax error, and FastAPI answers bodies it cannot decode at all with
+    a 400. Only malformed requests take this path.
+    """
+    try:
+        data = json.loads(body)
+    except json.JSONDecodeError as e:
+        raise RequestValidationError(
+            [
+                {
+                    "type": "json_invalid",
+                    "loc": ("body", e.pos),
+                    "msg": "JSON decode error",
+                    "input": {},
+                    "ctx": {"error": e.msg},
+                }
+            ]
+        )
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="There was an error parsing the body",
+        )
+    try:
+        return _update_balance_adapter.validate_python(data).amount
+    except ValidationError as e:
+        _raise_body_errors(request, _body_errors(e))
+
+
+def _raise_body_errors(request: Request, errors: List[Dict[str, Any]]) -> NoReturn:
+    """Raise body errors after any account ID errors, as FastAPI orders them."""
+    try:
+        _account_id_adapter.validate_python(request.path_params["account_id"])
+    except ValidationError as e:
+        errors = [
+            {**detail, "loc": ("path", "account_id", *detail["loc"])}
+            for detail in e.errors(include_url=False)
+        ] + errors
+    raise RequestValidationError(errors)
+
+
+def _missing_body() -> Dict[str, Any]:
+    """FastAPI's error for an absent body."""
+    return {"type": "missing", "loc": ("body",), "msg": "Field required", "input": None}
+
+
+def _is_json(content_type: Optional[str]) -> bool:
+    """Whether FastAPI would treat a body with this content type as JSON."""
+    if not content_type:
+        return False
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return media_type == "application/json" or (
+        media_type.startswith("application/") and media_type.endswith("+json")
+    )
+
+
+def _body_errors(error: ValidationError) -> List[Dict[str, Any]]:
+    """Reshape pydantic errors the way FastAPI reports body errors."""
+    errors = []
+    for detail in error.errors(include_url=False):
+        if detail["type"] == "model_type" and detail["input"] is None:
+            # FastAPI treats a JSON null body as no body at all.
+            errors.append(_missing_body())
+        elif detail["type"] == "model_type":
+            errors.append(
+                {
+                    "type": "model_attributes_type",
+                    "loc": ("body",),
+                    "msg": MODEL_ATTRIBUTES_MSG,
+                    "input": detail["input"],
+                }
+            )
+        else:
+            errors.append({**detail, "loc": ("body", *detail["loc"])})
+    return errors
+
+
+router = APIRouter(prefix="/accounts", tags=["accounts"], route_class=TracedRoute)
 
 
 @router.get(
@@ -42,9 +198,7 @@ def list_accounts():
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail={
                 "error_code": ErrorCode.INTERNAL_ERROR,
-                "message": (
-                    "Lock error: failed to acquire lock while listing accounts"
-                ),
+                "message": "Failed to retrieve accounts: Internal server error occurred",
             },
         )
 
@@ -60,6 +214,10 @@ def list_accounts():
             "model": ErrorResponse,
             "description": "Failed to create account due to invalid input",
         },
+        503: {
+            "model": ErrorResponse,
+            "description": "Failed to create account - service is shutting down",
+        },
         500: {
             "model": ErrorResponse,
             "description": ("Failed to create account due to internal" "server error"),
@@ -81,6 +239,14 @@ def create_account(account_request: CreateAccountRequest):
                 "message": f"Failed to create account: {str(e)}",
             },
         )
+    except ServiceDrainingError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "error_code": ErrorCode.SERVICE_UNAVAILABLE,
+                "message": "Failed to create account: Service is shutting down",
+            },
+        )
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -91,6 +257,33 @@ def create_account(account_request: CreateAccountRequest):
         )
 
 
+@router.get(
+    "/aggregates",
+    operation_id="getAccountAggregates",
+    summary="Retrieve account aggregates",
+    response_model=AccountAggregates,
+    status_code=status.HTTP_200_OK,
+    responses={
+        500: {
+            "model": ErrorResponse,
+            "description": "Failed to retrieve aggregates due to internal server error",
+        }
+    },
+)
+def get_account_aggregates():
+    """Returns total balance and account counts, broken down by account type."""
+    try:
+        return account_service.get_aggregates()
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "error_code": ErrorCode.INTERNAL_ERROR,
+                "message": "Failed to retrieve aggregates: Internal server error occurred",
+            },
+        )
+
+
 @router.get(
     "/{account_id}",
     operation_id="getAccountById",
@@ -109,7 +302,9 @@ def create_account(account_request: CreateAccountRequest):
     },
 )
 def get_account_by_id(
-    account_id: UUID = Path(..., description="The UUID of the account to retrieve")
+    account_id: Annotated[
+        AccountIdPath, Path(description="The UUID of the account to retrieve")
+    ]
 ):
     """Returns details for the specified account including current balance."""
     try:
@@ -119,7 +314,7 @@ def get_account_by_id(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail={
                     "error_code": ErrorCode.NOT_FOUND,
-                    "message": f"Failed to retrieve account: ID {account_id} not found",
+                    "message": f"Failed to retrieve account: ID {format_account_id(account_id)} not found",
                 },
             )
         return account
@@ -150,19 +345,30 @@ def get_account_by_id(
             "model": ErrorResponse,
             "description": "Debit operation failed - account not found",
         },
+        503: {
+            "model": ErrorResponse,
+            "description": "Debit operation failed - service is shutting down",
+        },
         500: {
             "model": ErrorResponse,
             "description": "Failed to process debit operation due to internal server error",
         },
     },
+    openapi_extra=UPDATE_BALANCE_BODY,
 )
-def debit_account(
-    update_request: UpdateBalanceRequest,
-    account_id: UUID = Path(..., description="The UUID of the account to debit"),
+async def debit_account(
+    account_id: Annotated[
+        AccountIdPath, Path(description="The UUID of the account to debit")
+    ],
+    amount: Annotated[float, Depends(read_update_amount)],
 ):
     """Decreases the account's balance by the specified amount."""
+    mark_validated()
     try:
-        return account_service.debit_account(account_id, update_request.amount)
+        # The service blocks on the write lock, so keep it off the event loop.
+        return await run_in_threadpool(
+            account_service.debit_account, account_id, amount
+        )
     except KeyError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -184,6 +390,14 @@ def debit_account(
                 "message": f"Failed to debit account: {str(e)}",
             },
         )
+    except ServiceDrainingError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "error_code": ErrorCode.SERVICE_UNAVAILABLE,
+                "message": "Failed to debit account: Service is shutting down",
+            },
+        )
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -209,19 +423,29 @@ def debit_account(
             "model": ErrorResponse,
             "description": "Credit operation failed - account not found",
         },
+        503: {
+            "model": ErrorResponse,
+            "description": "Credit operation failed - service is shutting down",
+        },
         500: {
             "model": ErrorResponse,
             "description": "Failed to process credit operation due to internal server error",
         },
     },
+    openapi_extra=UPDATE_BALANCE_BODY,
 )
-def credit_account(
-    update_request: UpdateBalanceRequest,
-    account_id: UUID = Path(..., description="The UUID of the account to credit"),
+async def credit_account(
+    account_id: Annotated[
+        AccountIdPath, Path(description="The UUID of the account to credit")
+    ],
+    amount: Annotated[float, Depends(read_update_amount)],
 ):
     """Increases the account's balance by the specified amount."""
+    mark_validated()
     try:
-        return account_service.credit_account(account_id, update_request.amount)
+        return await run_in_threadpool(
+            account_service.credit_account, account_id, amount
+        )
     except KeyError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -238,6 +462,14 @@ def credit_account(
                 "message": f"Failed to credit account: {str(e)}",
             },
         )
+    except ServiceDrainingError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "error_code": ErrorCode.SERVICE_UNAVAILABLE,
+                "message": "Failed to credit account: Service is shutting down",
+            },
+        )
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -0,0 +1,320 @@
+"""
+Serving profile and runtime settings for the Accounts API.
+
+Settings are read from an optional TOML file (``[server]``, ``[accounts]``,
+``[interest]`` and ``[tracing]`` tables, path given by
+``ACCOUNTS_CONFIG_FILE``) and then overridden by individual environment
+variables, so the container image can ship one profile and a deployment can
+still tweak a single knob.
+"""
+
+import math
+import os
+import tomllib
+from dataclasses import dataclass, fields, replace
+from datetime import time, timezone
+from functools import lru_cache
+from typing import Any, Dict, Mapping, Optional, Type, TypeVar
+from urllib.parse import urlsplit
+
+CONFIG_FILE_ENV = "ACCOUNTS_CONFIG_FILE"
+
+T = TypeVar("T")
+
+LOOP_CHOICES = ("auto", "asyncio", "uvloop")
+HTTP_CHOICES = ("auto", "h11", "httptools")
+# uvicorn's level names, which it only accepts in lowercase.
+LOG_LEVELS = ("critical", "error", "warning", "info", "debug", "trace")
+ID_FORMATS = ("uuid4", "uuid7")
+
+# Environment variable for each setting. LOG_LEVEL is kept unprefixed because
+# docker-compose.yaml already sets it.
+ENV_VARS = {
+    "host": "ACCOUNTS_HOST",
+    "port": "ACCOUNTS_PORT",
+    "loop": "ACCOUNTS_LOOP",
+    "http": "ACCOUNTS_HTTP",
+    "backlog": "ACCOUNTS_BACKLOG",
+    "keep_alive_timeout": "ACCOUNTS_KEEP_ALIVE_TIMEOUT",
+    "limit_concurrency": "ACCOUNTS_LIMIT_CONCURRENCY",
+    "threadpool_size": "ACCOUNTS_THREADPOOL_SIZE",
+    "workers": "ACCOUNTS_WORKERS",
+    "graceful_shutdown_timeout": "ACCOUNTS_GRACEFUL_SHUTDOWN_TIMEOUT",
+    "shutdown_delay": "ACCOUNTS_SHUTDOWN_DELAY",
+    "access_log": "ACCOUNTS_ACCESS_LOG",
+    "log_level": "LOG_LEVEL",
+}
+
+ACCOUNT_ENV_VARS = {
+    "id_format": "ACCOUNTS_ID_FORMAT",
+    "id_pool_size": "ACCOUNTS_ID_POOL_SIZE",
+    "snapshot_path": "ACCOUNTS_SNAPSHOT_PATH",
+    "drain_timeout": "ACCOUNTS_DRAIN_TIMEOUT",
+}
+
+INTEREST_ENV_VARS = {
+    "annual_rate": "ACCOUNTS_SAVINGS_ANNUAL_RATE",
+    "run_at": "ACCOUNTS_ACCRUAL_RUN_AT",
+    "chunk_size": "ACCOUNTS_ACCRUAL_CHUNK_SIZE",
+}
+
+TRACING_ENV_VARS = {
+    "sample_ratio": "ACCOUNTS_TRACE_SAMPLE_RATIO",
+    "buffer_size": "ACCOUNTS_TRACE_BUFFER_SIZE",
+    "export_file": "ACCOUNTS_TRACE_EXPORT_FILE",
+    "export_endpoint": "ACCOUNTS_TRACE_EXPORT_ENDPOINT",
+    "export_interval": "ACCOUNTS_TRACE_EXPORT_INTERVAL",
+}
+
+
+@dataclass(frozen=True)
+class ServerSettings:
+    """Tunable uvicorn and threadpool settings"""
+
+    host: str = "0.0.0.0"
+    port: int = 8081
+    # "auto" picks uvloop and httptools when they are installed.
+    loop: str = "auto"
+    http: str = "auto"
+    backlog: int = 2048
+    # Kong keeps idle upstream connections for 60s by default. The server must
+    # hold them longer, otherwise Kong reuses a socket the server just closed.
+    keep_alive_timeout: int = 75
+    limit_concurrency: Optional[int] = None
+    # Sync routes run in AnyIO's worker threadpool (40 threads by default).
+    threadpool_size: int = 40
+    # Accounts live in process memory, so only one worker process is allowed:
+    # with more, each worker would answer for a different set of accounts.
+    workers: int = 1
+    # Seconds to let open connections finish their requests after SIGTERM
+    # before uvicorn cancels them.
+    graceful_shutdown_timeout: int = 20
+    # Seconds /ready reports draining after SIGTERM before uvicorn closes the
+    # listener, so load balancers stop routing here first.
+    shutdown_delay: float = 0.0
+    access_log: bool = True
+    log_level: str = "info"
+
+    def __post_init__(self) -> None:
+        if self.loop not in LOOP_CHOICES:
+            raise ValueError(f"loop must be one of {LOOP_CHOICES}, got {self.loop!r}")
+        if self.http not in HTTP_CHOICES:
+            raise ValueError(f"http must be one of {HTTP_CHOICES}, got {self.http!r}")
+        if self.log_level not in LOG_LEVELS:
+            raise ValueError(
+                f"log_level must be one of {LOG_LEVELS}, got {self.log_level!r}"
+            )
+        for name in ("port", "backlog", "threadpool_size", "workers"):
+            if getattr(self, name) < 1:
+                raise ValueError(f"{name} must be positive")
+        for name in (
+            "keep_alive_timeout",
+            "graceful_shutdown_timeout",
+            "shutdown_delay",
+        ):
+            if getattr(self, name) < 0:
+                raise ValueError(f"{name} must be non-negative")
+        if self.limit_concurrency is not None and self.limit_concurrency < 1:
+            raise ValueError("limit_concurrency must be positive")
+        if self.workers > 1:
+            raise ValueError(
+                "workers must be 1: accounts are held in process memory, so "
+                "each worker would serve its own accounts"
+            )
+
+    @classmethod
+    def load(
+        cls,
+        environ: Optional[Mapping[str, str]] = None,
+        config_file: Optional[str] = None,
+    ) -> "ServerSettings":
+        """Build settings from a TOML file and environment overrides."""
+        return _load(cls, "server", ENV_VARS, environ, config_file)
+
+    def uvicorn_kwargs(self) -> Dict[str, Any]:
+        """Keyword arguments for ``uvicorn.run``."""
+        return {
+            "host": self.host,
+            "port": self.port,
+            "loop": self.loop,
+            "http": self.http,
+            "backlog": self.backlog,
+            "timeout_keep_alive": self.keep_alive_timeout,
+            "limit_concurrency": self.limit_concurrency,
+            "workers": self.workers,
+            "timeout_graceful_shutdown": self.graceful_shutdown_timeout,
+            "access_log": self.access_log,
+            "log_level": self.log_level,
+        }
+
+
+@dataclass(frozen=True)
+class AccountSettings:
+    """Account storage settings"""
+
+    # "uuid7" makes account IDs time-ordered.
+    id_format: str = "uuid4"
+    # Number of IDs drawn from the CSPRNG per os.urandom call.
+    id_pool_size: int = 4096
+    # Binary snapshot loaded at startup and written at shutdown; accounts are
+    # kept in memory only when unset.
+    snapshot_path: Optional[str] = None
+    # Seconds shutdown waits for in-flight writes before taking the snapshot.
+    drain_timeout: float = 10.0
+
+    def __post_init__(self) -> None:
+        if self.id_format not in ID_FORMATS:
+            raise ValueError(
+                f"id_format must be one of {ID_FORMATS}, got {self.id_format!r}"
+            )
+        if self.id_pool_size < 1:
+            raise ValueError("id_pool_size must be positive")
+        if self.drain_timeout < 0:
+            raise ValueError("drain_timeout must be non-negative")
+
+    @classmethod
+    def load(
+        cls,
+        environ: Optional[Mapping[str, str]] = None,
+        config_file: Optional[str] = None,
+    ) -> "AccountSettings":
+        """Build settings from a TOML file and environment overrides."""
+        return _load(cls, "accounts", ACCOUNT_ENV_VARS, environ, config_file)
+
+
+@dataclass(frozen=True)
+class InterestSettings:
+    """Nightly savings interest accrual settings"""
+
+    # Accrual is disabled while the rate is zero.
+    annual_rate: float = 0.0
+    # UTC time of day ("HH:MM") at which the nightly accrual runs.
+    run_at: str = "00:05"
+    chunk_size: int = 10_000
+
+    def __post_init__(self) -> None:
+        if not math.isfinite(self.annual_rate):
+            raise ValueError("annual_rate must be a finite number")
+        if self.annual_rate < 0:
+            raise ValueError("annual_rate must be non-negative")
+        if self.chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        self.run_at_time()
+
+    def run_at_time(self) -> time:
+        """Parse ``run_at`` into a UTC ``datetime.time``."""
+        try:
+            return time.fromisoformat(self.run_at).replace(tzinfo=timezone.utc)
+        except ValueError:
+            raise ValueError(f"run_at must be HH:MM, got {self.run_at!r}")
+
+    @classmethod
+    def load(
+        cls,
+        environ: Optional[Mapping[str, str]] = None,
+        config_file: Optional[str] = None,
+    ) -> "InterestSettings":
+        """Build settings from a TOML file and environment overrides."""
+        return _load(cls, "interest", INTEREST_ENV_VARS, environ, config_file)
+
+
+@dataclass(frozen=True)
+class TracingSettings:
+    """Request tracing sampling and export settings"""
+
+    # Share of requests without a caller sampling decision that are traced.
+    sample_ratio: float = 0.0
+    buffer_size: int = 2048
+    # OTLP/JSON file to append to, or OTLP/HTTP endpoint to POST to.
+    export_file: Optional[str] = None
+    export_endpoint: Optional[str] = None
+    export_interval: float = 10.0
+
+    def __post_init__(self) -> None:
+        if not 0.0 <= self.sample_ratio <= 1.0:
+            raise ValueError("sample_ratio must be between 0 and 1")
+        if self.buffer_size < 1:
+            raise ValueError("buffer_size must be positive")
+        if self.export_interval <= 0:
+            raise ValueError("export_interval must be positive")
+        if self.export_endpoint is not None:
+            endpoint = urlsplit(self.export_endpoint)
+            if endpoint.scheme not in ("http", "https") or not endpoint.netloc:
+                raise ValueError(
+                    "export_endpoint must be an http:// or https:// URL, "
+                    f"got {self.export_endpoint!r}"
+                )
+
+    @classmethod
+    def load(
+        cls,
+        environ: Optional[Mapping[str, str]] = None,
+        config_file: Optional[str] = None,
+    ) -> "TracingSettings":
+        """Build settings from a TOML file and environment overrides."""
+        return _load(cls, "tracing", TRACING_ENV_VARS, environ, config_file)
+
+
+def _load(
+    cls: Type[T],
+    section: str,
+    env_vars: Mapping[str, str],
+    environ: Optional[Mapping[str, str]],
+    config_file: Optional[str],
+) -> T:
+    """Read ``cls`` from a TOML table and then apply environment overrides."""
+    environ = os.environ if environ is None else environ
+    config_file = config_file or environ.get(CONFIG_FILE_ENV)
+
+    settings = cls()
+    if config_file:
+        with open(config_file, "rb") as f:
+            table = tomllib.load(f).get(section, {})
+        unknown = set(table) - set(env_vars)
+        if unknown:
+            raise ValueError(f"Unknown {section} settings: {sorted(unknown)}")
+        settings = replace(settings, **table)
+
+    overrides: Dict[str, Any] = {}
+    for field in fields(cls):
+        raw = environ.get(env_vars[field.name])
+        if raw is not None and raw != "":
+            overrides[field.name] = _coerce(env_vars[field.name], field.type, raw)
+    return replace(settings, **overrides)
+
+
+def _coerce(env_var: str, annotation: Any, raw: str) -> Any:
+    """Convert an environment variable string to the field's type."""
+    if annotation in (int, Optional[int], float):
+        convert = float if annotation is float else int
+        try:
+            return convert(raw)
+        except ValueError:
+            raise ValueError(f"{env_var} must be a number, got {raw!r}")
+    if annotation is bool:
+        return raw.strip().lower() in ("1", "true", "yes", "on")
+    return raw
+
+
+@lru_cache(maxsize=1)
+def get_server_settings() -> ServerSettings:
+    """Return the process-wide serving profile."""
+    return ServerSettings.load()
+
+
+@lru_cache(maxsize=1)
+def get_account_settings() -> AccountSettings:
+    """Return the process-wide account storage settings."""
+    return AccountSettings.load()
+
+
+@lru_cache(maxsize=1)
+def get_interest_settings() -> InterestSettings:
+    """Return the process-wide interest accrual settings."""
+    return InterestSettings.load()
+
+
+@lru_cache(maxsize=1)
+def get_tracing_settings() -> TracingSettings:
+    """Return the process-wide tracing settings."""
+    return TracingSettings.load()
@@ -3,20 +3,195 @@ Entry point for the Accounts API.
 A demonstration microservice for Kong API Gateway tooling.
 """
 
+import copy
+import logging
+import math
+import os
+import signal
+import threading
+import time
+from contextlib import asynccontextmanager
+from dataclasses import replace
+from enum import Enum
+
 import uvicorn
-from fastapi import FastAPI
+from anyio import to_thread
+from fastapi import FastAPI, HTTPException, Request, status
+from fastapi.exception_handlers import request_validation_exception_handler
+from fastapi.exceptions import RequestValidationError
 
+from accounts.api.models import ErrorCode, ErrorResponse
 from accounts.api.routes import router
+from accounts.config import (
+    get_account_settings,
+    get_interest_settings,
+    get_server_settings,
+    get_tracing_settings,
+)
+from accounts.services.account import account_service
+from accounts.services.interest import InterestAccrualEngine
+from accounts.services.snapshot import InterestState, read_snapshot, write_snapshot
+from accounts.tracing import PeriodicExporter, TracingMiddleware, tracer
+
+logger = logging.getLogger(__name__)
+
+
+class Readiness(str, Enum):
+    """Lifecycle states reported by the readiness endpoint"""
+
+    STARTING = "starting"
+    READY = "ready"
+    DRAINING = "draining"
+
+
+def drain_on_signal(app: FastAPI, handler, delay: float):
+    """Wrap uvicorn's SIGTERM handler so the app reports draining first.
+
+    uvicorn closes its listener as soon as its own handler runs, so readiness
+    has to change here for anyone to see it. With ``delay``, the handler is
+    passed on only after that many seconds, while the listener keeps serving,
+    so health checks can take the instance out of rotation. A second signal
+    is passed on straight away.
+    """
+
+    def handle(signum, frame):
+        repeated = app.state.readiness is Readiness.DRAINING
+        app.state.readiness = Readiness.DRAINING
+        if delay > 0 and not repeated:
+            timer = threading.Timer(delay, handler, (signum, frame))
+            timer.daemon = True
+            timer.start()
+        else:
+            handler(signum, frame)
+
+    return handle
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load the snapshot, apply the serving profile and start background jobs.
+
+    Startup runs before uvicorn binds its socket, so the snapshot is loaded
+    before any request can arrive. On shutdown, which uvicorn begins once
+    SIGTERM has closed the listener and open connections have finished (or
+    ``graceful_shutdown_timeout`` expired), writes are drained and the
+    accounts are flushed to the snapshot.
+    """
+    app.state.readiness = Readiness.STARTING
+    settings = get_server_settings()
+    to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_size
+
+    accounts = get_account_settings()
+    interest_state = InterestState()
+    if accounts.snapshot_path and os.path.exists(accounts.snapshot_path):
+        started = time.perf_counter()
+        loaded = read_snapshot(accounts.snapshot_path)
+        account_service.restore(loaded)
+        interest_state = loaded.interest
+        # This frame lives as long as the app; don't pin the key column.
+        del loaded
+        logger.info(
+            "Loaded %d accounts from %s in %.2fs",
+            account_service.get_aggregates().count,
+            accounts.snapshot_path,
+            time.perf_counter() - started,
+        )
+
+    tracing = get_tracing_settings()
+    tracer.configure(tracing.sample_ratio, tracing.buffer_size)
+    exporter = None
+    if tracing.export_file or tracing.export_endpoint:
+        exporter = PeriodicExporter(
+            tracer,
+            tracing.export_interval,
+            path=tracing.export_file,
+            endpoint=tracing.export_endpoint,
+        )
+        exporter.start()
+
+    interest = get_interest_settings()
+    engine = None
+    if interest.annual_rate > 0:
+        engine = InterestAccrualEngine(
+            account_service,
+            interest.annual_rate,
+            interest.chunk_size,
+            state=interest_state,
+        )
+        engine.start(interest.run_at_time())
+
+    # uvicorn has installed its signal handlers by now, in the main thread
+    # only; under a test client there is nothing to wrap.
+    uvicorn_handler = None
+    if threading.current_thread() is threading.main_thread():
+        uvicorn_handler = signal.getsignal(signal.SIGTERM)
+        if callable(uvicorn_handler):
+            signal.signal(
+                signal.SIGTERM,
+                drain_on_signal(app, uvicorn_handler, settings.shutdown_delay),
+            )
+    app.state.readiness = Readiness.READY
+    yield
+    app.state.readiness = Readiness.DRAINING
+    if callable(uvicorn_handler):
+        signal.signal(signal.SIGTERM, uvicorn_handler)
+    if engine is not None:
+        engine.stop()
+        interest_state = engine.state()
+    if not account_service.drain(accounts.drain_timeout):
+        logger.warning(
+            "Writes still in flight after %.1fs; they may be missing from the snapshot",
+            accounts.drain_timeout,
+        )
+    if accounts.snapshot_path:
+        started = time.perf_counter()
+        snapshot = replace(account_service.snapshot(), interest=interest_state)
+        write_snapshot(snapshot, accounts.snapshot_path)
+        logger.info(
+            "Saved %d accounts to %s in %.2fs",
+            snapshot.count,
+            accounts.snapshot_path,
+            time.perf_counter() - started,
+        )
+    if exporter is not None:
+        exporter.stop()
+
 
 app = FastAPI(
     title="Accounts API",
     description="This API manages Kong Bank account information and balances. Used for Kong tooling demonstrations.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
+app.state.readiness = Readiness.STARTING
+app.add_middleware(TracingMiddleware)
 app.include_router(router)
 
 
+def _json_safe(value):
+    """``value`` with NaN and infinities, which JSON cannot carry, as strings."""
+    if isinstance(value, float) and not math.isfinite(value):
+        return str(value)
+    if isinstance(value, dict):
+        return {key: _json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(item) for item in value]
+    return value
+
+
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    """FastAPI's 422 response, safe to render when the rejected input is not finite"""
+    errors = [
+        {**error, "input": _json_safe(error["input"])} if "input" in error else error
+        for error in exc.errors()
+    ]
+    return await request_validation_exception_handler(
+        request, RequestValidationError(errors)
+    )
+
+
 @app.get(
     "/health",
     tags=["health"],
@@ -39,9 +214,55 @@ def health_check_head():
     return None
 
 
+@app.get(
+    "/ready",
+    tags=["health"],
+    operation_id="readinessCheck",
+    summary="Readiness check endpoint",
+    responses={
+        503: {
+            "model": ErrorResponse,
+            "description": "API is shutting down",
+        }
+    },
+)
+def readiness_check(request: Request):
+    """Returns whether the API is ready to take traffic"""
+    readiness = request.app.state.readiness
+    if readiness is not Readiness.READY:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "error_code": ErrorCode.SERVICE_UNAVAILABLE,
+                "message": f"Accounts API is not ready: {readiness.value}",
+            },
+        )
+    return "Accounts API is ready"
+
+
+def log_config(log_level: str) -> dict:
+    """uvicorn's logging config, with the ``accounts`` loggers added.
+
+    uvicorn only configures its own loggers, so without this the service's
+    log records (snapshot load and save, interest runs) are dropped.
+    """
+    config = copy.deepcopy(uvicorn.config.LOGGING_CONFIG)
+    config["loggers"]["accounts"] = {
+        "handlers": ["default"],
+        "level": uvicorn.config.LOG_LEVELS[log_level],
+        "propagate": False,
+    }
+    return config
+
+
 def main():
-    """Run the application with uvicorn"""
-    uvicorn.run(app, host="0.0.0.0", port=8081)
+    """Run the application with uvicorn using the configured serving profile"""
+    settings = get_server_settings()
+    uvicorn.run(
+        "accounts.main:app",
+        log_config=log_config(settings.log_level),
+        **settings.uvicorn_kwargs(),
+    )
 
 
 if __name__ == "__main__":
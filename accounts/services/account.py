@@ -1,27 +1,219 @@
 """
 Account service module for business logic related to bank accounts.
+
+Published ``Account`` records are treated as immutable: every balance change
+builds a new record and swaps it into the store under the write lock. Readers
+therefore never observe a half-applied update, and a listing only has to copy
+the current set of references to get a consistent point-in-time snapshot.
+
+Accounts restored from a binary snapshot start out as rows in the snapshot's
+columns, indexed by ID, and only become ``Account`` records the first time
+they are read or written. Restoring millions of accounts therefore costs one
+dict build instead of one model validation per account. The index and columns
+are never modified after a restore (a row that becomes a record is shadowed by
+it), so bulk readers copy references to them under the lock and do the
+per-account work after releasing it.
 """
 
-from typing import Dict, List, Optional
-from uuid import UUID, uuid4
+import math
+import threading
+from array import array
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from accounts import tracing
+from accounts.api.models import Account, AccountAggregates, AccountType
+from accounts.config import get_account_settings
+from accounts.services.ids import (
+    AccountId,
+    AccountIdGenerator,
+    account_id_from_key,
+    account_key,
+    format_account_id,
+)
+from accounts.services.snapshot import (
+    ACCOUNT_TYPES,
+    TYPE_CODES,
+    AccountSnapshot,
+    split_keys,
+)
 
-from accounts.api.models import Account, AccountType
+
+class ServiceDrainingError(RuntimeError):
+    """Raised for writes attempted after the service started draining"""
 
 
 class AccountService:
     """Service for handling account operations"""
 
-    def __init__(self) -> None:
+    def __init__(self, id_generator: Optional[AccountIdGenerator] = None) -> None:
         """Initialize the account service with an empty database."""
-        self._accounts_db: Dict[UUID, Account] = {}
+        self._ids = id_generator or AccountIdGenerator()
+        self._lock = threading.Lock()
+        # Keyed by the 16-byte form of the account ID.
+        self._accounts_db: Dict[bytes, Account] = {}
+        self._total_balance = 0.0
+        self._count_by_type: Dict[AccountType, int] = {t: 0 for t in AccountType}
+        self._balance_by_type: Dict[AccountType, float] = {t: 0.0 for t in AccountType}
+        # Restored accounts: key -> row index into the snapshot columns below.
+        # Rows that have become records are counted in _thawed.
+        self._cold: Dict[bytes, int] = {}
+        self._cold_types = b""
+        self._cold_balances = array("d")
+        self._thawed = 0
+        # In-flight writes, tracked so shutdown can wait for them.
+        self._writes = threading.Condition()
+        self._writers = 0
+        self._draining = False
+
+    def clear(self) -> None:
+        """Remove all accounts, reset the aggregate counters and reopen writes."""
+        with self._lock:
+            self._accounts_db = {}
+            self._cold = {}
+            self._cold_types = b""
+            self._cold_balances = array("d")
+            self._thawed = 0
+            self._total_balance = 0.0
+            self._count_by_type = {t: 0 for t in AccountType}
+            self._balance_by_type = {t: 0.0 for t in AccountType}
+        with self._writes:
+            self._draining = False
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Refuse new writes and wait for in-flight ones to finish.
+
+        Returns ``False`` if writes were still running when ``timeout``
+        seconds had passed.
+        """
+        with self._writes:
+            self._draining = True
+            return self._writes.wait_for(lambda: not self._writers, timeout)
+
+    def snapshot(self) -> AccountSnapshot:
+        """Copy every account and the aggregate counters into columns.
+
+        Only references and the counters are copied under the lock; the
+        columns are built after releasing it.
+        """
+        with tracing.span("AccountService.snapshot") as span:
+            with span.acquire(self._lock):
+                hot = dict(self._accounts_db)
+                cold, cold_types, cold_balances = self._cold_rows()
+                thawed = self._thawed
+                total_balance = self._total_balance
+                balance_by_type = dict(self._balance_by_type)
+
+            types = bytes([TYPE_CODES[account.type] for account in hot.values()])
+            balances = array("d", [account.balance for account in hot.values()])
+            if thawed:
+                # Rows that became records were written above as records.
+                cold_keys = [key for key in cold if key not in hot]
+                rows = [row for key, row in cold.items() if key not in hot]
+                types += bytes([cold_types[row] for row in rows])
+                balances.extend([cold_balances[row] for row in rows])
+            else:
+                # The index is in row order, so untouched rows are the columns
+                # exactly as restored.
+                cold_keys = cold
+                types += cold_types
+                balances.extend(cold_balances)
+            keys = b"".join(hot) + b"".join(cold_keys)
+            return AccountSnapshot(
+                keys, types, balances, total_balance, balance_by_type
+            )
+
+    def restore(self, snapshot: AccountSnapshot) -> None:
+        """Replace all accounts with the contents of ``snapshot``."""
+        index = {key: row for row, key in enumerate(split_keys(snapshot.keys))}
+        if len(index) != snapshot.count:
+            raise ValueError("Snapshot contains duplicate account IDs")
+        count_by_type = snapshot.count_by_type()
+
+        with tracing.span(
+            "AccountService.restore", size=snapshot.count
+        ) as span, span.acquire(self._lock):
+            self._accounts_db = {}
+            self._cold = index
+            self._cold_types = snapshot.types
+            self._cold_balances = snapshot.balances
+            self._thawed = 0
+            self._total_balance = snapshot.total_balance
+            self._count_by_type = count_by_type
+            self._balance_by_type = dict(snapshot.balance_by_type)
 
     def list_accounts(self) -> List[Account]:
-        """Returns a list of all accounts."""
-        return list(self._accounts_db.values())
+        """Returns a point-in-time snapshot of all accounts.
+
+        Only the reference copy happens under the lock; the records themselves
+        are immutable, so serializing the result does not block writers.
+        Records for restored rows are built after the lock is released and are
+        not kept.
+        """
+        with tracing.span("AccountService.list_accounts") as span:
+            with span.acquire(self._lock):
+                hot = dict(self._accounts_db)
+                cold, cold_types, cold_balances = self._cold_rows()
+            accounts = list(hot.values())
+            accounts.extend(
+                [
+                    _thaw(key, cold_types[row], cold_balances[row])
+                    for key, row in cold.items()
+                    if key not in hot
+                ]
+            )
+            return accounts
+
+    def balances_of_type(self, account_type: AccountType) -> List[Tuple[bytes, float]]:
+        """Key and balance of every account of ``account_type``.
+
+        Restored rows are read straight from the snapshot columns instead of
+        becoming records, and nothing but references is copied under the lock.
+        """
+        with tracing.span("AccountService.balances_of_type") as span:
+            with span.acquire(self._lock):
+                hot = dict(self._accounts_db)
+                cold, cold_types, cold_balances = self._cold_rows()
+            code = TYPE_CODES[account_type]
+            rows = [
+                (key, account.balance)
+                for key, account in hot.items()
+                if account.type == account_type
+            ]
+            rows.extend(
+                [
+                    (key, cold_balances[row])
+                    for key, row in cold.items()
+                    if cold_types[row] == code and key not in hot
+                ]
+            )
+            return rows
+
+    def get_aggregates(self) -> AccountAggregates:
+        """Return totals maintained incrementally by every write.
 
-    def get_account(self, account_id: UUID) -> Optional[Account]:
+        The totals are running float sums, so after many writes they can
+        differ from a fresh sum of the balances by rounding error.
+        """
+        with tracing.span("AccountService.get_aggregates") as span, span.acquire(
+            self._lock
+        ):
+            return AccountAggregates(
+                total_balance=self._total_balance,
+                count=len(self._accounts_db) + len(self._cold) - self._thawed,
+                count_by_type=dict(self._count_by_type),
+                balance_by_type=dict(self._balance_by_type),
+            )
+
+    def get_account(self, account_id: AccountId) -> Optional[Account]:
         """Get an account by its ID."""
-        return self._accounts_db.get(account_id)
+        with tracing.span("AccountService.get_account") as span:
+            key = account_key(account_id)
+            account = self._accounts_db.get(key)
+            if account is None and self._cold:
+                with span.acquire(self._lock):
+                    account = self._lookup(key)
+            return account
 
     def create_account(
         self, account_type: AccountType, initial_balance: float
@@ -29,46 +221,149 @@ class AccountService:
         """Create a new account with the specified type and initial balance."""
         if initial_balance < 0:
             raise ValueError("Initial balance must be non-negative")
+        if not math.isfinite(initial_balance):
+            raise ValueError("Initial balance must be a finite number")
 
-        account_id = uuid4()
+        account_id = self._ids.new_id()
         new_account = Account(
             account_id=account_id, type=account_type, balance=initial_balance
         )
 
-        self._accounts_db[account_id] = new_account
+        with tracing.span(
+            "AccountService.create_account"
+        ) as span, self._write(), span.acquire(self._lock):
+            self._accounts_db[account_id.bytes] = new_account
+            self._apply_delta(account_type, initial_balance, count=1)
         return new_account
 
-    def debit_account(self, account_id: UUID, amount: float) -> Account:
+    def debit_account(self, account_id: AccountId, amount: float) -> Account:
         """Debit (subtract) an amount from an account."""
         if amount <= 0:
             raise ValueError("Debit amount must be positive")
+        if not math.isfinite(amount):
+            raise ValueError("Debit amount must be a finite number")
 
-        account = self.get_account(account_id)
-        if not account:
-            raise KeyError(f"Account with ID {account_id} not found")
+        with tracing.span(
+            "AccountService.debit_account"
+        ) as span, self._write(), span.acquire(self._lock):
+            key = account_key(account_id)
+            account = self._lookup(key)
+            if not account:
+                raise KeyError(f"Account with ID {format_account_id(key)} not found")
 
-        if account.balance < amount:
-            raise ValueError(
-                f"Insufficient funds - balance is {account.balance}, attempted to debit {amount}"
-            )
+            if account.balance < amount:
+                raise ValueError(
+                    f"Insufficient funds - balance is {account.balance}, attempted to debit {amount}"
+                )
 
-        account.balance -= amount
-        self._accounts_db[account_id] = account
-        return account
+            return self._replace_balance(key, account, account.balance - amount)
 
-    def credit_account(self, account_id: UUID, amount: float) -> Account:
+    def credit_account(self, account_id: AccountId, amount: float) -> Account:
         """Credit (add) an amount to an account."""
         if amount <= 0:
             raise ValueError("Credit amount must be positive")
+        if not math.isfinite(amount):
+            raise ValueError("Credit amount must be a finite number")
+
+        with tracing.span(
+            "AccountService.credit_account"
+        ) as span, self._write(), span.acquire(self._lock):
+            key = account_key(account_id)
+            account = self._lookup(key)
+            if not account:
+                raise KeyError(f"Account with ID {format_account_id(key)} not found")
+
+            return self._replace_balance(key, account, account.balance + amount)
+
+    def credit_batch(self, account_ids: List[AccountId], amounts: List[float]) -> None:
+        """Credit many accounts atomically.
 
-        account = self.get_account(account_id)
-        if not account:
-            raise KeyError(f"Account with ID {account_id} not found")
+        Either every credit is applied or, if any account does not exist or
+        any amount is negative or not finite, none are. An account may appear
+        more than once. The lock is held for the whole batch, so callers should
+        keep batches small enough not to stall live traffic.
+        """
+        if len(account_ids) != len(amounts):
+            raise ValueError("Every credit needs exactly one amount")
+        for amount in amounts:
+            if amount < 0:
+                raise ValueError("Credit amount must not be negative")
+            if not math.isfinite(amount):
+                raise ValueError("Credit amount must be a finite number")
 
-        account.balance += amount
-        self._accounts_db[account_id] = account
+        with tracing.span(
+            "AccountService.credit_batch", size=len(account_ids)
+        ) as span, self._write(), span.acquire(self._lock):
+            keys = [account_key(account_id) for account_id in account_ids]
+            for key in keys:
+                if self._lookup(key) is None:
+                    raise KeyError(
+                        f"Account with ID {format_account_id(key)} not found"
+                    )
+            for key, amount in zip(keys, amounts):
+                # Re-read each time: an earlier credit may have replaced it.
+                account = self._accounts_db[key]
+                self._replace_balance(key, account, account.balance + amount)
+
+    @contextmanager
+    def _write(self) -> Iterator[None]:
+        """Track an in-flight write, refusing it once the service is draining."""
+        with self._writes:
+            if self._draining:
+                raise ServiceDrainingError("Account service is shutting down")
+            self._writers += 1
+        try:
+            yield
+        finally:
+            with self._writes:
+                self._writers -= 1
+                if not self._writers:
+                    self._writes.notify_all()
+
+    def _lookup(self, key: bytes) -> Optional[Account]:
+        """Find an account, turning a restored row into a record if needed.
+
+        Caller must hold the lock.
+        """
+        account = self._accounts_db.get(key)
+        if account is None and self._cold:
+            row = self._cold.get(key)
+            if row is not None:
+                account = _thaw(key, self._cold_types[row], self._cold_balances[row])
+                self._accounts_db[key] = account
+                self._thawed += 1
         return account
 
+    def _cold_rows(self) -> Tuple[Dict[bytes, int], bytes, array]:
+        """The restored index and columns. Caller must hold the lock."""
+        return self._cold, self._cold_types, self._cold_balances
+
+    def _replace_balance(self, key: bytes, account: Account, balance: float) -> Account:
+        """Publish a new record for ``account``. Caller must hold the lock."""
+        updated = account.model_copy(update={"balance": balance})
+        self._accounts_db[key] = updated
+        self._apply_delta(account.type, balance - account.balance)
+        return updated
+
+    def _apply_delta(
+        self, account_type: AccountType, balance: float, count: int = 0
+    ) -> None:
+        """Update the aggregate counters. Caller must hold the lock."""
+        self._total_balance += balance
+        self._balance_by_type[account_type] += balance
+        self._count_by_type[account_type] += count
+
+
+def _thaw(key: bytes, type_code: int, balance: float) -> Account:
+    """Build the record for a restored row."""
+    return Account(
+        account_id=account_id_from_key(key),
+        type=ACCOUNT_TYPES[type_code],
+        balance=balance,
+    )
+
 
 # Create a singleton instance of the account service
-account_service = AccountService()
+account_service = AccountService(
+    AccountIdGenerator.from_settings(get_account_settings())
+)
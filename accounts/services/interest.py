@@ -0,0 +1,258 @@
+"""
+Interest accrual for savings accounts.
+
+Interest is computed for every savings account in one vectorized pass over a
+snapshot of balances (NumPy when installed, the ``array`` module otherwise)
+and applied through ``AccountService.credit_batch`` in fixed-size chunks. Each
+chunk is atomic, and the service lock is released between chunks so live
+debits and credits interleave with the run instead of waiting for all of it.
+
+A run stopped between chunks leaves its remaining credits pending. They are
+applied before the next run and, with the last accrued day, are kept in the
+account snapshot across restarts (see ``InterestAccrualEngine.state``).
+"""
+
+import logging
+import math
+import threading
+import time
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from datetime import date, datetime
+from datetime import time as dt_time
+from datetime import timedelta, timezone
+from typing import Deque, Optional, Sequence
+
+from accounts.api.models import AccountType
+from accounts.services.account import AccountService
+from accounts.services.ids import AccountId, account_key
+from accounts.services.snapshot import InterestState, split_keys
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised when numpy is absent
+    np = None
+
+logger = logging.getLogger(__name__)
+
+DAYS_PER_YEAR = 365
+# Runs kept in ``InterestAccrualEngine.runs``; each holds 24 bytes per account.
+RUN_HISTORY = 3
+
+
+@dataclass(frozen=True)
+class AccrualRun:
+    """Record of one accrual run: the interest computed for each account"""
+
+    accrued_on: date
+    annual_rate: float
+    days: int
+    # 16-byte account IDs back to back, and the interest for each.
+    keys: bytes
+    amounts: array
+    # Credits applied by the run itself; fewer than ``count`` if it was
+    # stopped, in which case the rest were left pending on the engine.
+    applied: int
+
+    @property
+    def count(self) -> int:
+        """Number of accounts interest was computed for."""
+        return len(self.amounts)
+
+    @property
+    def complete(self) -> bool:
+        """Whether the run applied every credit."""
+        return self.applied == self.count
+
+    @property
+    def total(self) -> float:
+        """Total interest computed."""
+        return math.fsum(self.amounts)
+
+    def amount_for(self, account_id: AccountId) -> Optional[float]:
+        """Interest computed for ``account_id`` in this run, if any."""
+        key = account_key(account_id)
+        offset = self.keys.find(key)
+        # A match must start on a key boundary, not straddle two keys.
+        while offset > 0 and offset % 16:
+            offset = self.keys.find(key, offset + 1)
+        return None if offset < 0 else self.amounts[offset // 16]
+
+
+def compute_interest(
+    balances: Sequence[float], annual_rate: float, days: int = 1
+) -> Sequence[float]:
+    """Interest for each balance, compounded daily and rounded to cents."""
+    factor = (1 + annual_rate / DAYS_PER_YEAR) ** days - 1
+    if np is not None:
+        return np.round(np.asarray(balances, dtype=np.float64) * factor, 2)
+    return array("d", [round(balance * factor, 2) for balance in balances])
+
+
+class InterestAccrualEngine:
+    """Accrues interest on savings accounts, once per calendar day"""
+
+    def __init__(
+        self,
+        service: AccountService,
+        annual_rate: float,
+        chunk_size: int = 10_000,
+        state: Optional[InterestState] = None,
+    ) -> None:
+        """Initialize the engine for ``service`` at ``annual_rate``.
+
+        ``state`` resumes from a previous process: the last accrued day and
+        any credits it had not applied yet.
+        """
+        if not math.isfinite(annual_rate):
+            raise ValueError("Annual rate must be a finite number")
+        if annual_rate < 0:
+            raise ValueError("Annual rate must be non-negative")
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be positive")
+        state = state or InterestState()
+        self._service = service
+        self.annual_rate = annual_rate
+        self.chunk_size = chunk_size
+        self.runs: Deque[AccrualRun] = deque(maxlen=RUN_HISTORY)
+        self.last_accrued_on = state.accrued_on
+        self._pending_keys = state.pending_keys
+        self._pending_amounts = state.pending_amounts
+        self._run_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def state(self) -> InterestState:
+        """Progress to carry across a restart."""
+        with self._run_lock:
+            return InterestState(
+                self.last_accrued_on, self._pending_keys, self._pending_amounts
+            )
+
+    def accrue(self, as_of: Optional[date] = None) -> Optional[AccrualRun]:
+        """Accrue interest up to ``as_of`` (default: today, UTC).
+
+        Interest is computed on the savings balances at the start of the run
+        for every day since the previous run. Credits left pending by an
+        interrupted run are applied first. Returns ``None`` if interest has
+        already been accrued for ``as_of`` or the engine was stopped before
+        the pending credits were applied.
+        """
+        as_of = as_of or datetime.now(timezone.utc).date()
+        with self._run_lock:
+            if self._pending_amounts:
+                self._apply_pending()
+                if self._pending_amounts:
+                    return None
+            if self.last_accrued_on is None:
+                days = 1
+            else:
+                days = (as_of - self.last_accrued_on).days
+            if days <= 0:
+                return None
+
+            savings = [
+                (key, balance)
+                for key, balance in self._service.balances_of_type(AccountType.SAVINGS)
+                if balance > 0
+            ]
+            keys = b"".join([key for key, _ in savings])
+            interest = compute_interest(
+                [balance for _, balance in savings], self.annual_rate, days
+            )
+            # Same float64 column whether NumPy computed it or not.
+            amounts = array("d", interest.tobytes())
+
+            # The day counts as accrued once its credits are computed; from
+            # here on they are applied, or kept pending, exactly once.
+            self.last_accrued_on = as_of
+            self._pending_keys, self._pending_amounts = keys, amounts
+            applied = self._apply_pending()
+
+            run = AccrualRun(as_of, self.annual_rate, days, keys, amounts, applied)
+            self.runs.append(run)
+            if run.complete:
+                logger.info(
+                    "Accrued %.2f interest on %d savings accounts for %s",
+                    run.total,
+                    run.count,
+                    as_of,
+                )
+            else:
+                logger.warning(
+                    "Accrual for %s stopped after %d of %d savings accounts; "
+                    "the rest are credited before the next run",
+                    as_of,
+                    run.applied,
+                    run.count,
+                )
+            return run
+
+    def start(self, run_at: dt_time) -> None:
+        """Run ``accrue`` every day at ``run_at`` (UTC) on a daemon thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._schedule, args=(run_at,), name="interest-accrual", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the scheduler thread, if running.
+
+        A run in progress stops after its current chunk.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _apply_pending(self) -> int:
+        """Apply pending credits chunk by chunk until done or stopped.
+
+        Returns the number applied. Caller must hold the run lock.
+        """
+        keys, amounts = self._pending_keys, self._pending_amounts
+        applied = 0
+        while applied < len(amounts) and not self._stop.is_set():
+            end = min(applied + self.chunk_size, len(amounts))
+            first, last = 16 * applied, 16 * end
+            # tolist() so array scalars never reach the API models.
+            self._service.credit_batch(
+                split_keys(keys[first:last]), amounts[applied:end].tolist()
+            )
+            applied = end
+            # Let writers waiting on the service lock go first.
+            time.sleep(0)
+        offset = 16 * applied
+        self._pending_keys = keys[offset:]
+        self._pending_amounts = amounts[applied:]
+        return applied
+
+    def _schedule(self, run_at: dt_time) -> None:
+        with self._run_lock:
+            if self._pending_amounts:
+                try:
+                    applied = self._apply_pending()
+                    logger.info(
+                        "Applied %d interest credits left by an interrupted run",
+                        applied,
+                    )
+                except Exception:
+                    logger.exception("Applying pending interest credits failed")
+        while not self._stop.wait(_seconds_until(run_at)):
+            try:
+                self.accrue()
+            except Exception:
+                logger.exception("Interest accrual failed")
+
+
+def _seconds_until(run_at: dt_time) -> float:
+    """Seconds from now until the next occurrence of ``run_at`` (UTC)."""
+    now = datetime.now(timezone.utc)
+    target = datetime.combine(now.date(), run_at.replace(tzinfo=timezone.utc))
+    if target <= now:
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
@@ -0,0 +1,206 @@
+"""
+Binary snapshot of the account store.
+
+The file is laid out in columns so it is written and read with a few bulk
+copies rather than per-account serialization:
+
+    header    magic, format version, account count, total balance,
+              account type names and the balance held in each type, then
+              the last day interest was accrued and the pending credit count
+    keys      16-byte account IDs
+    types     one byte per account, indexing the header's type names
+    balances  little-endian float64
+    pending   16-byte IDs, then float64 amounts, of interest credits an
+              interrupted accrual run had not applied yet
+    crc32     of everything before it
+
+Snapshots are written to a temporary file next to the target and renamed into
+place, so a crash while dumping leaves the previous snapshot intact.
+"""
+
+import os
+import struct
+import sys
+import zlib
+from array import array
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, List, Optional
+
+from accounts.api.models import AccountType
+
+MAGIC = b"ACCTSNAP"
+VERSION = 1
+
+# Account types in the order their one-byte codes refer to.
+ACCOUNT_TYPES = tuple(AccountType)
+TYPE_CODES = {account_type: code for code, account_type in enumerate(ACCOUNT_TYPES)}
+
+_HEADER = struct.Struct("<8sHQdH")
+# Interest state: proleptic ordinal of the last accrued day (0 if none) and
+# the number of pending credits.
+_INTEREST = struct.Struct("<IQ")
+_CRC = struct.Struct("<I")
+
+
+def split_keys(keys: bytes) -> List[bytes]:
+    """Split a column of back-to-back 16-byte keys into a list of keys."""
+    starts = range(0, len(keys), 16)
+    return [
+        keys[start:end] for start, end in zip(starts, range(16, len(keys) + 16, 16))
+    ]
+
+
+@dataclass(frozen=True)
+class InterestState:
+    """Interest accrual progress carried across restarts"""
+
+    accrued_on: Optional[date] = None
+    # Credits computed by an interrupted run but not applied yet.
+    pending_keys: bytes = b""
+    pending_amounts: array = field(default_factory=lambda: array("d"))
+
+
+@dataclass(frozen=True)
+class AccountSnapshot:
+    """Column-oriented copy of every account and the aggregate counters"""
+
+    keys: bytes
+    types: bytes
+    balances: array
+    total_balance: float
+    balance_by_type: Dict[AccountType, float]
+    interest: InterestState = field(default_factory=InterestState)
+
+    @property
+    def count(self) -> int:
+        """Number of accounts in the snapshot."""
+        return len(self.types)
+
+    def count_by_type(self) -> Dict[AccountType, int]:
+        """Number of accounts of each type."""
+        return {t: self.types.count(TYPE_CODES[t]) for t in ACCOUNT_TYPES}
+
+
+def write_snapshot(snapshot: AccountSnapshot, path: str) -> None:
+    """Write ``snapshot`` to ``path`` atomically."""
+    names = ",".join(t.value for t in ACCOUNT_TYPES).encode()
+    interest = snapshot.interest
+    accrued_on = interest.accrued_on.toordinal() if interest.accrued_on else 0
+    header = b"".join(
+        [
+            _HEADER.pack(
+                MAGIC, VERSION, snapshot.count, snapshot.total_balance, len(names)
+            ),
+            names,
+            struct.pack(
+                f"<{len(ACCOUNT_TYPES)}d",
+                *(snapshot.balance_by_type[t] for t in ACCOUNT_TYPES),
+            ),
+            _INTEREST.pack(accrued_on, len(interest.pending_amounts)),
+        ]
+    )
+    balances = _little_endian(snapshot.balances)
+    pending_amounts = _little_endian(interest.pending_amounts)
+    columns = (
+        snapshot.keys,
+        snapshot.types,
+        balances,
+        interest.pending_keys,
+        pending_amounts,
+    )
+
+    crc = zlib.crc32(header)
+    for column in columns:
+        crc = zlib.crc32(column, crc)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        for column in columns:
+            f.write(column)
+        f.write(_CRC.pack(crc))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path: str) -> AccountSnapshot:
+    """Read a snapshot written by ``write_snapshot``.
+
+    Raises ``ValueError`` if the file is not a snapshot, is from another
+    format version, or is truncated or corrupt.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < _HEADER.size + _CRC.size:
+        raise ValueError(f"{path} is not an account snapshot")
+    magic, version, count, total_balance, names_size = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not an account snapshot")
+    if version != VERSION:
+        raise ValueError(f"Unsupported snapshot version {version} in {path}")
+
+    names_start = _HEADER.size
+    names_end = names_start + names_size
+    if len(data) < names_end:
+        raise ValueError(f"Snapshot {path} is truncated or has trailing data")
+    names = data[names_start:names_end].decode().split(",")
+    file_types = [AccountType(name) for name in names]
+
+    interest_start = names_end + 8 * len(names)
+    if len(data) < interest_start + _INTEREST.size:
+        raise ValueError(f"Snapshot {path} is truncated or has trailing data")
+    sums = struct.unpack_from(f"<{len(names)}d", data, names_end)
+    accrued_on, pending = _INTEREST.unpack_from(data, interest_start)
+
+    keys_start = interest_start + _INTEREST.size
+    types_start = keys_start + 16 * count
+    balances_start = types_start + count
+    pending_keys_start = balances_start + 8 * count
+    pending_amounts_start = pending_keys_start + 16 * pending
+    end = pending_amounts_start + 8 * pending
+    if len(data) != end + _CRC.size:
+        raise ValueError(f"Snapshot {path} is truncated or has trailing data")
+    (crc,) = _CRC.unpack_from(data, end)
+    view = memoryview(data)
+    if zlib.crc32(view[:end]) != crc:
+        raise ValueError(f"Snapshot {path} failed its checksum")
+
+    keys = data[keys_start:types_start]
+    types = data[types_start:balances_start]
+    if file_types != list(ACCOUNT_TYPES):
+        # Written with a different set or order of types: map the codes over.
+        table = bytearray(range(256))
+        for code, account_type in enumerate(file_types):
+            table[code] = TYPE_CODES[account_type]
+        types = types.translate(table)
+    balances = _float_column(view[balances_start:pending_keys_start])
+    interest = InterestState(
+        date.fromordinal(accrued_on) if accrued_on else None,
+        data[pending_keys_start:pending_amounts_start],
+        _float_column(view[pending_amounts_start:end]),
+    )
+
+    balance_by_type = {t: 0.0 for t in ACCOUNT_TYPES}
+    balance_by_type.update(zip(file_types, sums))
+    return AccountSnapshot(
+        keys, types, balances, total_balance, balance_by_type, interest
+    )
+
+
+def _little_endian(column: array) -> array:
+    """``column`` in the file's little-endian byte order."""
+    if sys.byteorder == "big":
+        column = array("d", column)
+        column.byteswap()
+    return column
+
+
+def _float_column(data: memoryview) -> array:
+    """Read a little-endian float64 column."""
+    column = array("d")
+    column.frombytes(data)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column
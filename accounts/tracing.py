@@ -0,0 +1,436 @@
+"""
+Lightweight request tracing for the Accounts API.
+
+Incoming W3C ``traceparent`` headers are honoured, spans are kept in an
+in-process ring buffer, and buffered spans can be exported as OTLP/JSON to a
+file or an OTLP/HTTP collector. Nothing is allocated for requests that are not
+sampled: ``span()`` hands back a shared no-op object whenever there is no
+sampled span in the current context.
+"""
+
+import functools
+import inspect
+import json
+import logging
+import random
+import threading
+import time
+import urllib.request
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from fastapi.routing import APIRoute
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "accounts-service"
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+STATUS_UNSET = 0
+STATUS_ERROR = 2
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """A timed operation within a trace"""
+
+    __slots__ = (
+        "tracer",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "name",
+        "kind",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "status",
+        "_token",
+    )
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str],
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None,
+        start_ns: Optional[int] = None,
+    ) -> None:
+        self.tracer = tracer
+        self.trace_id = trace_id
+        self.span_id = "%016x" % random.getrandbits(64)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns() if start_ns is None else start_ns
+        self.end_ns = 0
+        self.attributes = attributes or {}
+        self.status = STATUS_UNSET
+        self._token = None
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.status = STATUS_ERROR
+            self.attributes["exception.type"] = exc_type.__name__
+        _current_span.reset(self._token)
+        self.end()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach an attribute to the span."""
+        self.attributes[key] = value
+
+    def acquire(self, lock: threading.Lock) -> "_TimedLock":
+        """Return a context manager that acquires ``lock`` and records the wait."""
+        return _TimedLock(self, lock)
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        """Finish the span and hand it to the tracer's buffer."""
+        self.end_ns = time.time_ns() if end_ns is None else end_ns
+        self.tracer.record(self)
+
+
+class _NoopSpan:
+    """Stand-in returned when the current request is not sampled"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        """Enter without touching the current span."""
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        """Exit without recording anything."""
+        return None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Discard the attribute."""
+        return None
+
+    def acquire(self, lock: threading.Lock) -> threading.Lock:
+        """Return ``lock`` itself, so the wait is not timed."""
+        return lock
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _TimedLock:
+    """Acquires a lock and stores the time spent waiting on the span"""
+
+    __slots__ = ("span", "lock")
+
+    def __init__(self, span: Span, lock: threading.Lock) -> None:
+        self.span = span
+        self.lock = lock
+
+    def __enter__(self) -> None:
+        started = time.perf_counter_ns()
+        self.lock.acquire()
+        self.span.attributes["lock.wait_ns"] = time.perf_counter_ns() - started
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.lock.release()
+
+
+class Tracer:
+    """Sampling decisions and the ring buffer of finished spans"""
+
+    def __init__(self, sample_ratio: float = 0.0, buffer_size: int = 2048) -> None:
+        """Initialize a tracer that keeps the last ``buffer_size`` spans."""
+        self.sample_ratio = sample_ratio
+        self._spans: Deque[Span] = deque(maxlen=buffer_size)
+
+    def configure(self, sample_ratio: float, buffer_size: int) -> None:
+        """Change the sampling ratio and buffer size, dropping buffered spans."""
+        self.sample_ratio = sample_ratio
+        self._spans = deque(maxlen=buffer_size)
+
+    def should_sample(self, parent: Optional[Tuple[str, str, bool]]) -> bool:
+        """Follow the caller's sampled flag, otherwise sample by ratio."""
+        if parent is not None:
+            return parent[2]
+        ratio = self.sample_ratio
+        return ratio >= 1.0 or (ratio > 0.0 and random.random() < ratio)
+
+    def start_span(
+        self,
+        name: str,
+        parent: Optional[Span] = None,
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None,
+        trace_id: Optional[str] = None,
+        parent_id: Optional[str] = None,
+        start_ns: Optional[int] = None,
+    ) -> Span:
+        """Create a span, as a child of ``parent`` or of a remote parent."""
+        if parent is not None:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        elif trace_id is None:
+            trace_id = "%032x" % random.getrandbits(128)
+        return Span(self, name, trace_id, parent_id, kind, attributes, start_ns)
+
+    def record(self, span: Span) -> None:
+        """Add a finished span to the ring buffer."""
+        self._spans.append(span)
+
+    def drain(self) -> List[Span]:
+        """Remove and return all buffered spans."""
+        spans = []
+        while True:
+            try:
+                spans.append(self._spans.popleft())
+            except IndexError:
+                return spans
+
+    def export_to_file(self, path: str) -> int:
+        """Append buffered spans to ``path`` as one OTLP/JSON line."""
+        spans = self.drain()
+        if spans:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(to_otlp_json(spans)) + "\n")
+        return len(spans)
+
+    def export_to_collector(self, endpoint: str, timeout: float = 5.0) -> int:
+        """POST buffered spans to an OTLP/HTTP JSON endpoint."""
+        spans = self.drain()
+        if spans:
+            request = urllib.request.Request(
+                endpoint,
+                data=json.dumps(to_otlp_json(spans)).encode(),
+                headers={"Content-Type": "application/json"},
+            )
+            urllib.request.urlopen(request, timeout=timeout).close()
+        return len(spans)
+
+
+class PeriodicExporter:
+    """Background thread that exports buffered spans at a fixed interval"""
+
+    def __init__(
+        self,
+        tracer: Tracer,
+        interval: float,
+        path: Optional[str] = None,
+        endpoint: Optional[str] = None,
+    ) -> None:
+        self.tracer = tracer
+        self.interval = interval
+        self.path = path
+        self.endpoint = endpoint
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="span-exporter", daemon=True
+        )
+
+    def start(self) -> None:
+        """Start exporting every ``interval`` seconds."""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the thread and export whatever is still buffered."""
+        self._stop.set()
+        self._thread.join()
+        self.flush()
+
+    def flush(self) -> None:
+        """Export the buffered spans now, logging rather than raising on failure.
+
+        Any error is caught, so one failed export never stops later ones.
+        """
+        try:
+            if self.path:
+                self.tracer.export_to_file(self.path)
+            elif self.endpoint:
+                self.tracer.export_to_collector(self.endpoint)
+        except Exception:
+            logger.exception("Span export failed")
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+
+tracer = Tracer()
+
+
+def span(name: str, **attributes: Any):
+    """Start a child of the current span, or a no-op if nothing is sampled."""
+    parent = _current_span.get()
+    if parent is None:
+        return NOOP_SPAN
+    return parent.tracer.start_span(name, parent=parent, attributes=attributes)
+
+
+def current_span() -> Optional[Span]:
+    """The active sampled span, if any."""
+    return _current_span.get()
+
+
+def parse_traceparent(value: str) -> Optional[Tuple[str, str, bool]]:
+    """Parse a W3C ``traceparent`` into (trace_id, parent_id, sampled)."""
+    parts = value.strip().split("-")
+    if len(parts) < 4 or len(parts[0]) != 2 or parts[0] == "ff":
+        return None
+    _, trace_id, parent_id, flags = parts[:4]
+    if len(trace_id) != 32 or len(parent_id) != 16 or len(flags) != 2:
+        return None
+    try:
+        if int(trace_id, 16) == 0 or int(parent_id, 16) == 0:
+            return None
+        sampled = bool(int(flags, 16) & 0x01)
+    except ValueError:
+        return None
+    return trace_id.lower(), parent_id.lower(), sampled
+
+
+def to_otlp_json(spans: List[Span]) -> Dict[str, Any]:
+    """Encode spans as an OTLP/JSON ``ExportTraceServiceRequest``."""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": _otlp_attributes({"service.name": SERVICE_NAME})
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": __name__},
+                        "spans": [_otlp_span(s) for s in spans],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+def _otlp_span(span: Span) -> Dict[str, Any]:
+    encoded = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": span.kind,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": _otlp_attributes(span.attributes),
+        "status": {"code": span.status},
+    }
+    if span.parent_id:
+        encoded["parentSpanId"] = span.parent_id
+    return encoded
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    encoded = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        encoded.append({"key": key, "value": typed})
+    return encoded
+
+
+class TracingMiddleware:
+    """ASGI middleware that opens the server span for sampled requests"""
+
+    def __init__(self, app: Callable, tracer: Tracer = tracer) -> None:
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        parent = None
+        for key, value in scope["headers"]:
+            if key == b"traceparent":
+                parent = parse_traceparent(value.decode("latin-1"))
+                break
+        if not self.tracer.should_sample(parent):
+            return await self.app(scope, receive, send)
+
+        server_span = self.tracer.start_span(
+            scope["method"],
+            kind=SPAN_KIND_SERVER,
+            trace_id=parent[0] if parent else None,
+            parent_id=parent[1] if parent else None,
+            attributes={
+                "http.request.method": scope["method"],
+                "url.path": scope["path"],
+            },
+        )
+
+        async def send_with_status(message) -> None:
+            if message["type"] == "http.response.start":
+                server_span.attributes["http.response.status_code"] = message["status"]
+                if message["status"] >= 500:
+                    server_span.status = STATUS_ERROR
+            await send(message)
+
+        with server_span:
+            await self.app(scope, receive, send_with_status)
+            route = scope.get("route")
+            if route is not None:
+                server_span.name = f"{scope['method']} {route.path}"
+                server_span.attributes["http.route"] = route.path
+
+
+class TracedRoute(APIRoute):
+    """API route that traces routing and request validation
+
+    The ``validate`` span runs from route dispatch until the endpoint starts,
+    so it covers reading the body, pydantic validation and the hand-off to the
+    threadpool for sync endpoints. Async endpoints end it with
+    ``mark_validated``.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        if not inspect.iscoroutinefunction(endpoint):
+            endpoint = _traced_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        name = f"route {self.operation_id or self.name}"
+
+        async def traced_handler(request):
+            with span(name, **{"http.route": self.path}):
+                return await handler(request)
+
+        return traced_handler
+
+
+def mark_validated() -> None:
+    """Close the ``validate`` span of the current route.
+
+    Called automatically when a sync endpoint starts; async endpoints that
+    validate their own input call it once they are done.
+    """
+    parent = _current_span.get()
+    if parent is not None:
+        parent.tracer.start_span(
+            "validate", parent=parent, start_ns=parent.start_ns
+        ).end()
+
+
+def _traced_endpoint(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a sync endpoint so its start closes the ``validate`` span."""
+
+    @functools.wraps(endpoint)
+    def traced(*args, **kwargs):
+        mark_validated()
+        return endpoint(*args, **kwargs)
+
+    return traced
@@ -0,0 +1,84 @@
+"""
+Micro-benchmark for account ID generation and lookup.
+
+Compares ``uuid.uuid4()`` with the pooled generator (UUIDv4 and UUIDv7), bulk
+account creation through ``AccountService`` with each, and a get by path
+string: ``UUID(text)`` plus a UUID-keyed dict versus ``parse_account_id`` plus
+the 16-byte-keyed store.
+
+Usage:
+    python benchmarks/account_ids.py --accounts 200000
+"""
+
+import argparse
+import time
+import uuid
+from types import SimpleNamespace
+
+from accounts.api.models import AccountType
+from accounts.services.account import AccountService
+from accounts.services.ids import AccountIdGenerator, parse_account_id
+
+
+def rate(label, count, func):
+    """Run ``func`` and print its throughput."""
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    print(
+        f"{label:40s} {count / elapsed:>12,.0f} ops/s {elapsed / count * 1e9:>8,.0f} ns/op"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--accounts", type=int, default=200_000)
+    args = parser.parse_args()
+    count = args.accounts
+
+    pooled = AccountIdGenerator()
+    ordered = AccountIdGenerator(time_ordered=True)
+    rate("uuid.uuid4()", count, lambda: [uuid.uuid4() for _ in range(count)])
+    rate("pooled uuid4", count, lambda: [pooled.new_id() for _ in range(count)])
+    rate("pooled uuid7", count, lambda: [ordered.new_id() for _ in range(count)])
+
+    baseline = SimpleNamespace(new_id=uuid.uuid4)
+    for label, generator in [
+        ("uuid.uuid4", baseline),
+        ("pooled uuid4", pooled),
+        ("pooled uuid7", ordered),
+    ]:
+        service = AccountService(generator)
+        rate(
+            f"create_account ({label})",
+            count,
+            lambda: [
+                service.create_account(AccountType.CHECKING, 100.0)
+                for _ in range(count)
+            ],
+        )
+
+    texts = [str(account.account_id) for account in service.list_accounts()]
+    by_uuid = {account.account_id: account for account in service.list_accounts()}
+    rate(
+        "get: UUID(text) + UUID-keyed dict",
+        count,
+        lambda: [by_uuid[uuid.UUID(t)] for t in texts],
+    )
+    rate(
+        "get: parse_account_id + bytes-keyed store",
+        count,
+        lambda: [service.get_account(parse_account_id(t)) for t in texts],
+    )
+    by_bytes = {
+        account.account_id.bytes: account for account in service.list_accounts()
+    }
+    rate(
+        "get: parse_account_id + bytes dict only",
+        count,
+        lambda: [by_bytes[parse_account_id(t)] for t in texts],
+    )
+
+
+if __name__ == "__main__":
+    main()
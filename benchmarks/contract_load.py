@@ -0,0 +1,346 @@
+"""
+Contract-driven load harness for the Accounts API.
+
+Reads the OpenAPI document embedded in ``accounts-service.yaml`` and turns
+every operation into a weighted load scenario using the request examples from
+the spec. Each response is checked against the documented status codes and
+schemas while under load, and each operation's latency is compared with its
+budget. Weights and budgets are OpenAPI extensions on the operations:
+
+``x-load-weight``
+    Relative share of requests for the operation (default 1, 0 to skip).
+``x-latency-budget-ms``
+    p99 latency budget in milliseconds.
+
+Run against the in-process app, or a running server with ``--base-url``:
+
+    python benchmarks/contract_load.py --duration 10 --concurrency 8
+
+Like the other benchmarks it needs the dev dependencies (PyYAML, httpx), which
+is why it lives here rather than in the ``accounts`` package.
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import httpx
+import yaml
+
+DEFAULT_SPEC = "accounts-service.yaml"
+HTTP_METHODS = ("get", "put", "post", "delete", "patch", "head", "options")
+UUID_PATTERN = re.compile(
+    r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$"
+)
+
+
+@dataclass
+class Operation:
+    """One operation from the spec, with its load settings"""
+
+    operation_id: str
+    method: str
+    path: str
+    path_params: List[str]
+    bodies: List[Any]
+    responses: Dict[str, Optional[Dict[str, Any]]]
+    weight: float = 1.0
+    latency_budget_ms: Optional[float] = None
+
+
+@dataclass
+class OperationStats:
+    """Latencies and contract violations recorded for one operation"""
+
+    latencies: List[float] = field(default_factory=list)
+    violations: List[str] = field(default_factory=list)
+
+    def percentile(self, pct: float) -> float:
+        """Latency percentile in milliseconds."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+        return ordered[index] * 1000
+
+
+def load_spec(path: str = DEFAULT_SPEC) -> Dict[str, Any]:
+    """Load the OpenAPI document, unwrapping an Insomnia export if needed."""
+    with open(path, encoding="utf-8") as f:
+        document = yaml.safe_load(f)
+    if "openapi" not in document:
+        document = document["spec"]["contents"]
+    return document
+
+
+def load_operations(spec: Dict[str, Any]) -> List[Operation]:
+    """Build the operations that take part in the load."""
+    operations = []
+    for path, item in spec["paths"].items():
+        for method in HTTP_METHODS:
+            if method not in item:
+                continue
+            definition = item[method]
+            weight = float(definition.get("x-load-weight", 1))
+            if weight <= 0:
+                continue
+            params = item.get("parameters", []) + definition.get("parameters", [])
+            operations.append(
+                Operation(
+                    operation_id=definition["operationId"],
+                    method=method.upper(),
+                    path=path,
+                    path_params=[p["name"] for p in params if p["in"] == "path"],
+                    bodies=_request_examples(definition),
+                    responses={
+                        str(status): _json_schema(response)
+                        for status, response in definition["responses"].items()
+                    },
+                    weight=weight,
+                    latency_budget_ms=definition.get("x-latency-budget-ms"),
+                )
+            )
+    return operations
+
+
+def _request_examples(definition: Dict[str, Any]) -> List[Any]:
+    body = definition.get("requestBody")
+    if not body:
+        return []
+    media = body["content"]["application/json"]
+    if "examples" in media:
+        return [example["value"] for example in media["examples"].values()]
+    return [media["example"]] if "example" in media else []
+
+
+def _json_schema(response: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    content = response.get("content", {}).get("application/json")
+    return content.get("schema") if content else None
+
+
+def validate(
+    instance: Any, schema: Dict[str, Any], spec: Dict[str, Any], where: str = "$"
+) -> List[str]:
+    """Validate ``instance`` against an OpenAPI 3.0 schema, returning errors.
+
+    Supports the subset the spec uses: ``$ref``, ``type``, ``properties``,
+    ``required``, ``items``, ``additionalProperties``, ``enum`` and the
+    ``uuid`` format.
+    """
+    if "$ref" in schema:
+        name = schema["$ref"].rsplit("/", 1)[-1]
+        schema = spec["components"]["schemas"][name]
+
+    expected = schema.get("type")
+    if expected and not _is_type(instance, expected):
+        return [f"{where}: expected {expected}, got {type(instance).__name__}"]
+    if "enum" in schema and instance not in schema["enum"]:
+        return [f"{where}: {instance!r} not in {schema['enum']}"]
+    if schema.get("format") == "uuid" and not UUID_PATTERN.match(str(instance)):
+        return [f"{where}: {instance!r} is not a uuid"]
+
+    errors = []
+    if expected == "object":
+        for name in schema.get("required", []):
+            if name not in instance:
+                errors.append(f"{where}: missing required property {name!r}")
+        properties = schema.get("properties", {})
+        extra = schema.get("additionalProperties")
+        for name, value in instance.items():
+            if name in properties:
+                errors += validate(value, properties[name], spec, f"{where}.{name}")
+            elif isinstance(extra, dict):
+                errors += validate(value, extra, spec, f"{where}.{name}")
+    elif expected == "array" and "items" in schema:
+        for index, item in enumerate(instance):
+            errors += validate(item, schema["items"], spec, f"{where}[{index}]")
+    return errors
+
+
+def _is_type(instance: Any, expected: str) -> bool:
+    if expected == "object":
+        return isinstance(instance, dict)
+    if expected == "array":
+        return isinstance(instance, list)
+    if expected == "string":
+        return isinstance(instance, str)
+    if expected == "boolean":
+        return isinstance(instance, bool)
+    if expected == "integer":
+        return isinstance(instance, int) and not isinstance(instance, bool)
+    if expected == "number":
+        return isinstance(instance, (int, float)) and not isinstance(instance, bool)
+    return True
+
+
+class ContractLoadRunner:
+    """Drives weighted load through an HTTP client and checks the contract"""
+
+    def __init__(
+        self,
+        client: Any,
+        spec: Dict[str, Any],
+        operations: List[Operation],
+        seed_accounts: int = 10,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        """Initialize a runner over an httpx-compatible ``client``."""
+        self.client = client
+        self.spec = spec
+        self.operations = operations
+        self.seed_accounts = seed_accounts
+        self.rng = rng or random.Random()
+        self.stats = {op.operation_id: OperationStats() for op in operations}
+        self._account_ids: List[str] = []
+        self._lock = threading.Lock()
+
+    def seed(self) -> None:
+        """Create the accounts that path parameters are filled from."""
+        for _ in range(self.seed_accounts):
+            response = self.client.post(
+                "/accounts", json={"type": "savings", "initial_balance": 1e12}
+            )
+            response.raise_for_status()
+            self._account_ids.append(response.json()["account_id"])
+
+    def run(self, duration: float, concurrency: int) -> None:
+        """Send weighted requests from ``concurrency`` threads for ``duration``."""
+        if not self._account_ids:
+            self.seed()
+        deadline = time.monotonic() + duration
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for worker in [
+                pool.submit(self._worker, deadline) for _ in range(concurrency)
+            ]:
+                worker.result()
+
+    def _worker(self, deadline: float) -> None:
+        weights = [op.weight for op in self.operations]
+        while time.monotonic() < deadline:
+            (operation,) = self.rng.choices(self.operations, weights)
+            self.call(operation)
+
+    def call(self, operation: Operation) -> None:
+        """Send one request for ``operation`` and record the result."""
+        path = operation.path
+        for name in operation.path_params:
+            path = path.replace("{" + name + "}", self.rng.choice(self._account_ids))
+        kwargs = {}
+        if operation.bodies:
+            kwargs["json"] = self.rng.choice(operation.bodies)
+
+        started = time.perf_counter()
+        response = self.client.request(operation.method, path, **kwargs)
+        elapsed = time.perf_counter() - started
+
+        violations = self.check(operation, response)
+        with self._lock:
+            stats = self.stats[operation.operation_id]
+            stats.latencies.append(elapsed)
+            stats.violations.extend(violations)
+
+    def check(self, operation: Operation, response: Any) -> List[str]:
+        """Contract violations in ``response``."""
+        status = str(response.status_code)
+        if status not in operation.responses:
+            return [f"undocumented status {status}: {response.text[:200]}"]
+        schema = operation.responses[status]
+        if schema is None or operation.method == "HEAD":
+            return []
+        try:
+            body = response.json()
+        except json.JSONDecodeError:
+            return [f"status {status}: response is not JSON"]
+        return [
+            f"status {status} {error}" for error in validate(body, schema, self.spec)
+        ]
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Per-operation results, with ``ok`` false for any failure."""
+        rows = []
+        for operation in self.operations:
+            stats = self.stats[operation.operation_id]
+            p99 = stats.percentile(99)
+            budget = operation.latency_budget_ms
+            over_budget = budget is not None and bool(stats.latencies) and p99 > budget
+            rows.append(
+                {
+                    "operation_id": operation.operation_id,
+                    "requests": len(stats.latencies),
+                    "p50_ms": stats.percentile(50),
+                    "p95_ms": stats.percentile(95),
+                    "p99_ms": p99,
+                    "budget_ms": budget,
+                    "over_budget": over_budget,
+                    "violations": stats.violations,
+                    "ok": not over_budget and not stats.violations,
+                }
+            )
+        return rows
+
+
+def format_report(rows: List[Dict[str, Any]]) -> str:
+    """Render report rows as a Markdown table followed by violations."""
+    lines = [
+        "| operationId | requests | p50 ms | p95 ms | p99 ms | budget ms | result |",
+        "|---|---|---|---|---|---|---|",
+    ]
+    for row in rows:
+        if row["violations"]:
+            result = f"{len(row['violations'])} contract violations"
+        elif row["over_budget"]:
+            result = "OVER BUDGET"
+        else:
+            result = "ok"
+        budget = "-" if row["budget_ms"] is None else f"{row['budget_ms']:g}"
+        lines.append(
+            f"| {row['operation_id']} | {row['requests']} | {row['p50_ms']:.2f} "
+            f"| {row['p95_ms']:.2f} | {row['p99_ms']:.2f} | {budget} | {result} |"
+        )
+    for row in rows:
+        for violation in sorted(set(row["violations"]))[:5]:
+            lines.append(f"{row['operation_id']}: {violation}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the harness and return a process exit code."""
+    parser = argparse.ArgumentParser(
+        description="Contract-driven load test for the Accounts API"
+    )
+    parser.add_argument("--spec", default=DEFAULT_SPEC)
+    parser.add_argument("--base-url", help="Target a running server instead")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed-accounts", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    spec = load_spec(args.spec)
+    operations = load_operations(spec)
+
+    if args.base_url:
+        client = httpx.Client(base_url=args.base_url)
+    else:
+        from fastapi.testclient import TestClient
+
+        from accounts.main import app
+
+        client = TestClient(app)
+
+    with client:
+        runner = ContractLoadRunner(client, spec, operations, args.seed_accounts)
+        runner.run(args.duration, args.concurrency)
+    rows = runner.report()
+    print(format_report(rows))
+    return 0 if all(row["ok"] for row in rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
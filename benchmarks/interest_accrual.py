@@ -0,0 +1,96 @@
+"""
+Benchmark for savings interest accrual.
+
+Part one times the vectorized interest computation over ``--accounts``
+balances with each available backend (NumPy, ``array``). Part two runs a full
+accrual through ``AccountService`` over ``--service-accounts`` savings
+accounts while another thread keeps crediting a checking account, and reports
+the worst latency that live traffic saw during the run.
+
+Usage:
+    python benchmarks/interest_accrual.py --accounts 10000000
+"""
+
+import argparse
+import random
+import threading
+import time
+from datetime import date
+
+from accounts.api.models import AccountType
+from accounts.services import interest
+from accounts.services.account import AccountService
+from accounts.services.interest import InterestAccrualEngine, compute_interest
+
+RATE = 0.045
+
+
+def bench_kernel(count):
+    """Time compute_interest over ``count`` balances per backend."""
+    balances = [random.uniform(0, 100_000) for _ in range(count)]
+    numpy = interest.np
+    backends = [("numpy", numpy)] if numpy is not None else []
+    backends.append(("array", None))
+    for name, module in backends:
+        interest.np = module
+        started = time.perf_counter()
+        compute_interest(balances, RATE)
+        elapsed = time.perf_counter() - started
+        print(
+            f"compute_interest[{name}] {count:,} balances: {elapsed:.3f}s "
+            f"({count / elapsed / 1e6:.1f}M/s)"
+        )
+    interest.np = numpy
+
+
+def bench_service(count, chunk_size):
+    """Run one accrual end to end alongside live credits."""
+    service = AccountService()
+    for _ in range(count):
+        service.create_account(AccountType.SAVINGS, random.uniform(0, 100_000))
+    live = service.create_account(AccountType.CHECKING, 0.0)
+
+    latencies = []
+    done = threading.Event()
+
+    def live_traffic():
+        while not done.is_set():
+            started = time.perf_counter()
+            service.credit_account(live.account_id, 1.0)
+            latencies.append(time.perf_counter() - started)
+
+    worker = threading.Thread(target=live_traffic)
+    worker.start()
+    engine = InterestAccrualEngine(service, RATE, chunk_size=chunk_size)
+    started = time.perf_counter()
+    run = engine.accrue(as_of=date.today())
+    elapsed = time.perf_counter() - started
+    done.set()
+    worker.join()
+
+    latencies.sort()
+    print(
+        f"accrue {run.count:,} accounts, chunk {chunk_size:,}: {elapsed:.2f}s "
+        f"({run.count / elapsed:,.0f} accounts/s)"
+    )
+    print(
+        f"  live credits during run: {len(latencies):,}, "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f}ms, "
+        f"max {latencies[-1] * 1000:.2f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--accounts", type=int, default=10_000_000)
+    parser.add_argument("--service-accounts", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, nargs="+", default=[1_000, 10_000])
+    args = parser.parse_args()
+
+    bench_kernel(args.accounts)
+    for chunk_size in args.chunk_size:
+        bench_service(args.service_accounts, chunk_size)
+
+
+if __name__ == "__main__":
+    main()
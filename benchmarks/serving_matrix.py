@@ -0,0 +1,163 @@
+"""
+Throughput matrix for uvicorn serving profiles.
+
+Starts the service once per profile (through ``python -m accounts.main`` with
+the profile passed as environment variables) and drives it the way Kong does:
+a fixed pool of persistent HTTP/1.1 connections, each issuing requests
+back-to-back. ``--pipeline`` sends several requests per connection before
+reading the responses.
+
+Every profile runs a single worker, the only count the service accepts while
+accounts are held in process memory.
+
+Usage:
+    python benchmarks/serving_matrix.py --duration 10 --connections 64
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+HOST = "127.0.0.1"
+
+MATRIX = {
+    "ACCOUNTS_LOOP": ["asyncio", "uvloop"],
+    "ACCOUNTS_HTTP": ["h11", "httptools"],
+    "ACCOUNTS_THREADPOOL_SIZE": ["8", "40"],
+}
+
+
+def wait_until_ready(port, timeout=15.0):
+    """Poll /health until the server answers."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"http://{HOST}:{port}/health", timeout=0.5)
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("server did not become ready")
+
+
+def seed_account(port):
+    """Create one account for the read/write workload."""
+    body = json.dumps({"type": "checking", "initial_balance": 1e12}).encode()
+    request = urllib.request.Request(
+        f"http://{HOST}:{port}/accounts",
+        data=body,
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)["account_id"]
+
+
+def build_requests(port, account_id):
+    """Raw requests for a 4:1 read/credit mix."""
+    get = (
+        f"GET /accounts/{account_id} HTTP/1.1\r\nHost: {HOST}:{port}\r\n\r\n"
+    ).encode()
+    body = b'{"amount": 1}'
+    credit = (
+        f"POST /accounts/{account_id}/credit HTTP/1.1\r\nHost: {HOST}:{port}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+    ).encode() + body
+    return [get, get, get, get, credit]
+
+
+async def read_response(reader):
+    """Read one response and return its status code."""
+    status_line = await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.partition(b":")
+        if name.lower() == b"content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return int(status_line.split()[1])
+
+
+async def connection_loop(port, requests, pipeline, stop_at, stats):
+    """Issue requests on one keep-alive connection until the deadline."""
+    reader, writer = await asyncio.open_connection(HOST, port)
+    cycle = itertools.cycle(requests)
+    try:
+        while time.monotonic() < stop_at:
+            batch = [next(cycle) for _ in range(pipeline)]
+            started = time.perf_counter()
+            writer.write(b"".join(batch))
+            await writer.drain()
+            for _ in batch:
+                if await read_response(reader) >= 400:
+                    stats["errors"] += 1
+            stats["latencies"].append((time.perf_counter() - started) / pipeline)
+            stats["count"] += pipeline
+    finally:
+        writer.close()
+
+
+async def drive(port, requests, connections, pipeline, duration):
+    """Run the load and return requests/s, p99 latency and error count."""
+    stats = {"count": 0, "errors": 0, "latencies": []}
+    stop_at = time.monotonic() + duration
+    await asyncio.gather(
+        *(
+            connection_loop(port, requests, pipeline, stop_at, stats)
+            for _ in range(connections)
+        )
+    )
+    latencies = sorted(stats["latencies"]) or [0.0]
+    p99 = latencies[int(len(latencies) * 0.99) - 1 if len(latencies) > 1 else 0]
+    return stats["count"] / duration, p99 * 1000, stats["errors"]
+
+
+def run_profile(profile, args, port):
+    """Start the server with ``profile`` and measure it."""
+    env = dict(
+        os.environ,
+        ACCOUNTS_HOST=HOST,
+        ACCOUNTS_PORT=str(port),
+        ACCOUNTS_ACCESS_LOG="false",
+        ACCOUNTS_WORKERS="1",
+        LOG_LEVEL="warning",
+        **profile,
+    )
+    server = subprocess.Popen([sys.executable, "-m", "accounts.main"], env=env)
+    try:
+        wait_until_ready(port)
+        requests = build_requests(port, seed_account(port))
+        return asyncio.run(
+            drive(port, requests, args.connections, args.pipeline, args.duration)
+        )
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--pipeline", type=int, default=1)
+    parser.add_argument("--port", type=int, default=18081)
+    args = parser.parse_args()
+
+    names = list(MATRIX)
+    print("| " + " | ".join(names) + " | req/s | p99 ms | errors |")
+    print("|" + "---|" * (len(names) + 3))
+    for values in itertools.product(*MATRIX.values()):
+        profile = dict(zip(names, values))
+        rps, p99, errors = run_profile(profile, args, args.port)
+        print(f"| {' | '.join(values)} | {rps:,.0f} | {p99:.2f} | {errors} |")
+
+
+if __name__ == "__main__":
+    main()
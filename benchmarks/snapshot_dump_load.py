@@ -0,0 +1,178 @@
+"""
+Benchmark for the binary account snapshot used across restarts.
+
+At ``--accounts`` (10M by default) it times writing and reading the snapshot
+file, restoring it into ``AccountService`` (the startup cost), the first read
+of a restored account, and taking a new snapshot of untouched restored
+accounts (the shutdown cost). At ``--materialized`` accounts it lists the
+restored accounts while another thread keeps crediting one of them, to show
+how long writers wait on a listing. It then turns every restored row into an
+``Account`` record, which is what an eager load would pay up front, and
+compares dumping and loading those records with the snapshot against
+``pickle``.
+
+Usage:
+    python benchmarks/snapshot_dump_load.py --accounts 10000000
+"""
+
+import argparse
+import functools
+import gc
+import os
+import pickle
+import random
+import tempfile
+import threading
+import time
+from array import array
+
+from accounts.api.models import AccountType
+from accounts.services.account import AccountService
+from accounts.services.snapshot import (
+    ACCOUNT_TYPES,
+    AccountSnapshot,
+    read_snapshot,
+    split_keys,
+    write_snapshot,
+)
+
+
+def timed(label, count, func):
+    """Run ``func``, print its duration and return its result."""
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:44s} {elapsed:8.2f} s {elapsed / count * 1e9:>8,.0f} ns/account")
+    return result
+
+
+def synthetic_snapshot(count):
+    """A snapshot of ``count`` accounts with random IDs, types and balances."""
+    # Map random bytes onto type codes without a per-account Python loop.
+    table = bytes(i % len(ACCOUNT_TYPES) for i in range(256))
+    types = os.urandom(count).translate(table)
+    balances = array("d", map(float, range(count)))
+    balance_by_type = {t: 0.0 for t in ACCOUNT_TYPES}
+    return AccountSnapshot(
+        os.urandom(16 * count), types, balances, 0.0, balance_by_type
+    )
+
+
+def worst_write_during(func, service, key):
+    """Run ``func`` while crediting ``key`` in a loop.
+
+    Returns ``func``'s result and the slowest credit. The result is returned
+    rather than dropped so freeing it is not counted against the writer.
+    """
+    done = threading.Event()
+    worst = 0.0
+
+    def credit():
+        nonlocal worst
+        while not done.is_set():
+            started = time.perf_counter()
+            service.credit_account(key, 1.0)
+            worst = max(worst, time.perf_counter() - started)
+
+    writer = threading.Thread(target=credit)
+    writer.start()
+    try:
+        result = func()
+    finally:
+        done.set()
+        writer.join()
+    return result, worst
+
+
+def run(count, path, label):
+    """Time a snapshot round trip through the service for ``count`` accounts."""
+    snapshot = synthetic_snapshot(count)
+    timed(
+        f"write_snapshot ({label})",
+        count,
+        functools.partial(write_snapshot, snapshot, path),
+    )
+    print(f"{'file size':44s} {os.path.getsize(path) / 1e6:8.1f} MB")
+    rows = random.sample(range(count), min(count // 10, 10_000))
+    sample = [
+        snapshot.keys[start:end] for start, end in ((16 * i, 16 * i + 16) for i in rows)
+    ]
+    del snapshot
+
+    loaded = timed(
+        f"read_snapshot ({label})", count, functools.partial(read_snapshot, path)
+    )
+    service = AccountService()
+    timed(f"restore ({label})", count, functools.partial(service.restore, loaded))
+    del loaded
+    started = time.perf_counter()
+    for key in sample:
+        service.get_account(key)
+    elapsed = time.perf_counter() - started
+    print(
+        f"{'first get of a restored account':44s} {elapsed / len(sample) * 1e9:>21,.0f} ns/get"
+    )
+    timed(f"snapshot, mostly untouched ({label})", count, service.snapshot)
+    return service
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--accounts", type=int, default=10_000_000)
+    parser.add_argument("--materialized", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    # Keep collector pauses out of the bulk timings, as in a quiet shutdown.
+    gc.disable()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "accounts.snap")
+        service = run(args.accounts, path, f"{args.accounts:,}")
+        del service
+
+        count = args.materialized
+        service = run(count, path, f"{count:,}")
+        keys = split_keys(read_snapshot(path).keys)
+        listed, worst = worst_write_during(
+            functools.partial(
+                timed,
+                f"list_accounts, untouched ({count:,})",
+                count,
+                service.list_accounts,
+            ),
+            service,
+            keys[0],
+        )
+        print(f"{'worst credit during the listing':44s} {worst * 1e3:8.2f} ms")
+        del listed
+
+        def read_every_account():
+            for key in keys:
+                service.get_account(key)
+
+        timed(f"materialize every account ({count:,})", count, read_every_account)
+        accounts = service.list_accounts()
+        snapshot = timed(f"snapshot, all records ({count:,})", count, service.snapshot)
+        timed(
+            f"write_snapshot, all records ({count:,})",
+            count,
+            functools.partial(write_snapshot, snapshot, path),
+        )
+
+        pickle_path = os.path.join(tmp, "accounts.pickle")
+
+        def dump_pickle():
+            with open(pickle_path, "wb") as f:
+                pickle.dump(accounts, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        def load_pickle():
+            with open(pickle_path, "rb") as f:
+                return pickle.load(f)
+
+        timed(f"pickle.dump of records ({count:,})", count, dump_pickle)
+        print(f"{'pickle file size':44s} {os.path.getsize(pickle_path) / 1e6:8.1f} MB")
+        restored = timed(f"pickle.load of records ({count:,})", count, load_pickle)
+        assert restored[0].type in AccountType
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark for request tracing overhead.
+
+Part one times ``tracing.span()`` on its own, unsampled and sampled. Part two
+drives the ASGI app in-process with credit requests at several sampling
+ratios and compares them against an app built from the same router without
+the tracing middleware.
+
+Usage:
+    python benchmarks/tracing_overhead.py --requests 20000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import timeit
+
+from fastapi import FastAPI
+
+from accounts import tracing
+from accounts.api.models import AccountType
+from accounts.api.routes import router
+from accounts.main import app
+from accounts.services.account import account_service
+
+TRACEPARENT = b"00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-00"
+
+
+def empty_call():
+    pass
+
+
+def traced_call():
+    with tracing.span("op"):
+        pass
+
+
+def bench_span():
+    """Per-call cost of span() with and without a sampled parent."""
+    number = 200_000
+    empty = timeit.timeit(empty_call, number=number)
+    noop = timeit.timeit(traced_call, number=number)
+    with tracing.tracer.start_span("root"):
+        sampled = timeit.timeit(traced_call, number=number)
+    tracing.tracer.drain()
+    print(f"empty call:       {empty / number * 1e9:,.0f} ns/call")
+    print(f"span() unsampled: {noop / number * 1e9:,.0f} ns/call")
+    print(f"span() sampled:   {sampled / number * 1e9:,.0f} ns/call")
+
+
+async def drive(asgi, path, body, count, headers):
+    """Send ``count`` requests straight into an ASGI callable."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json")] + headers,
+        "client": ("127.0.0.1", 1234),
+        "server": ("127.0.0.1", 8081),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for _ in range(count):
+        await asgi(dict(scope), receive, send)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20_000)
+    args = parser.parse_args()
+
+    bench_span()
+
+    account = account_service.create_account(AccountType.CHECKING, 0.0)
+    path = f"/accounts/{account.account_id}/credit"
+    body = json.dumps({"amount": 1.0}).encode()
+    baseline = FastAPI()
+    baseline.include_router(router)
+    cases = [
+        ("no tracing middleware", baseline, 0.0, []),
+        ("ratio 0, no traceparent", app, 0.0, []),
+        ("ratio 0, unsampled traceparent", app, 0.0, [(b"traceparent", TRACEPARENT)]),
+        ("ratio 0.01", app, 0.01, []),
+        ("ratio 1.0", app, 1.0, []),
+    ]
+    # Warm up the threadpool and pydantic validators.
+    asyncio.run(drive(baseline, path, body, 500, []))
+    for name, asgi, ratio, headers in cases:
+        tracing.tracer.configure(ratio, 2048)
+        elapsed = asyncio.run(drive(asgi, path, body, args.requests, headers))
+        print(
+            f"{name:32s} {args.requests / elapsed:>9,.0f} req/s "
+            f"{elapsed / args.requests * 1e6:>7.1f} us/req"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Local stand-in for an OpenTelemetry collector.
+Accepts OTLP/HTTP JSON on /v1/traces, prints a one-line summary per span and
+appends each payload to a file, so traces can be inspected without running a
+real collector.
+
+Run it, then start the service with:
+    ACCOUNTS_TRACE_SAMPLE_RATIO=1 \
+    ACCOUNTS_TRACE_EXPORT_ENDPOINT=http://localhost:4318/v1/traces make run
+"""
+
+import argparse
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class CollectorHandler(BaseHTTPRequestHandler):
+    """Handler for OTLP/HTTP JSON trace exports"""
+
+    output = "spans.jsonl"
+
+    def do_POST(self):
+        if self.path != "/v1/traces":
+            self.send_error(404)
+            return
+
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            self.send_error(400, "Body is not JSON")
+            return
+
+        with open(self.output, "a", encoding="utf-8") as f:
+            f.write(json.dumps(payload) + "\n")
+        for resource_spans in payload.get("resourceSpans", []):
+            for scope_spans in resource_spans.get("scopeSpans", []):
+                for span in scope_spans.get("spans", []):
+                    duration_ms = (
+                        int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])
+                    ) / 1e6
+                    print(f"{span['traceId']} {span['name']} {duration_ms:.3f}ms")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    """Run the collector until interrupted"""
+    parser = argparse.ArgumentParser(description="Local OTLP/HTTP JSON collector")
+    parser.add_argument("--port", type=int, default=4318)
+    parser.add_argument("--output", default="spans.jsonl")
+    args = parser.parse_args()
+
+    CollectorHandler.output = args.output
+    server = ThreadingHTTPServer(("0.0.0.0", args.port), CollectorHandler)
+    print(f"Collecting spans on http://localhost:{args.port}/v1/traces")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
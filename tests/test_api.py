@@ -2,10 +2,17 @@
 Test fixtures for the Accounts service tests.
 """
 
+import logging
+import signal
+import threading
+
 import pytest
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
-from accounts.main import app
+from accounts.api.models import AccountType
+from accounts.config import AccountSettings
+from accounts.main import Readiness, app, drain_on_signal, log_config
 from accounts.services.account import AccountService, account_service
 
 
@@ -18,12 +25,273 @@ def client():
 @pytest.fixture(autouse=True)
 def reset_account_service():
     """Reset the account service singleton between tests"""
-    account_service._accounts_db = {}
+    account_service.clear()
     yield
-    account_service._accounts_db = {}
+    account_service.clear()
 
 
 @pytest.fixture
 def new_account_service():
     """Fixture that returns a fresh instance of the account service"""
     return AccountService()
+
+
+def test_get_account_aggregates(client):
+    """Test the aggregates endpoint reflects created accounts"""
+    client.post("/accounts", json={"type": "checking", "initial_balance": 100.0})
+    client.post("/accounts", json={"type": "savings", "initial_balance": 400.0})
+
+    response = client.get("/accounts/aggregates")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["count"] == 2
+    assert body["total_balance"] == 500.0
+    assert body["count_by_type"] == {"checking": 1, "savings": 1}
+
+
+def test_get_account_accepts_unhyphenated_id(client):
+    """Test account IDs are accepted without hyphens"""
+    created = client.post(
+        "/accounts", json={"type": "checking", "initial_balance": 10.0}
+    ).json()
+
+    response = client.get(f"/accounts/{created['account_id'].replace('-', '')}")
+
+    assert response.status_code == 200
+    assert response.json()["account_id"] == created["account_id"]
+
+
+def test_get_account_with_malformed_id(client):
+    """Test malformed account IDs are rejected with a validation error"""
+    response = client.get("/accounts/not-a-uuid")
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "uuid_parsing"
+
+
+def test_get_missing_account(client):
+    """Test a well-formed but unknown account ID returns 404"""
+    account_id = "123e4567-e89b-12d3-a456-426614174000"
+
+    response = client.get(f"/accounts/{account_id}")
+
+    assert response.status_code == 404
+    assert account_id in response.json()["detail"]["message"]
+
+
+def test_credit_account(client):
+    """Test crediting through the raw-body decoding path"""
+    created = client.post(
+        "/accounts", json={"type": "savings", "initial_balance": 10.0}
+    ).json()
+
+    response = client.post(
+        f"/accounts/{created['account_id']}/credit", json={"amount": "2.5"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["balance"] == 12.5
+
+
+@pytest.mark.parametrize(
+    "body, headers, error_type",
+    [
+        (b"{}", {"content-type": "application/json"}, "missing"),
+        (b"null", {"content-type": "application/json"}, "missing"),
+        (b'{"amount": "abc"}', {"content-type": "application/json"}, "float_parsing"),
+        (b'{"amount": 1', {"content-type": "application/json"}, "json_invalid"),
+        (b"", {"content-type": "application/json"}, "missing"),
+        (b"[1]", {"content-type": "application/json"}, "model_attributes_type"),
+        (b'{"amount": 1}', {"content-type": "text/plain"}, "model_attributes_type"),
+    ],
+)
+def test_debit_account_invalid_body(client, body, headers, error_type):
+    """Test malformed debit bodies return FastAPI-style 422 errors"""
+    created = client.post(
+        "/accounts", json={"type": "checking", "initial_balance": 10.0}
+    ).json()
+
+    response = client.post(
+        f"/accounts/{created['account_id']}/debit", content=body, headers=headers
+    )
+
+    assert response.status_code == 422
+    detail = response.json()["detail"][0]
+    assert detail["type"] == error_type
+    assert detail["loc"][0] == "body"
+
+
+def test_debit_account_undecodable_body(client):
+    """Test a body that is not valid text gets FastAPI's 400, not a 422"""
+    created = client.post(
+        "/accounts", json={"type": "checking", "initial_balance": 10.0}
+    ).json()
+
+    response = client.post(
+        f"/accounts/{created['account_id']}/debit",
+        content=b"\xff",
+        headers={"content-type": "application/json"},
+    )
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "There was an error parsing the body"}
+
+
+def test_debit_invalid_id_and_body(client):
+    """Test path and body errors are reported together, as FastAPI does"""
+    response = client.post("/accounts/not-a-uuid/debit", json={"amount": "abc"})
+
+    assert response.status_code == 422
+    assert [detail["loc"] for detail in response.json()["detail"]] == [
+        ["path", "account_id"],
+        ["body", "amount"],
+    ]
+
+
+def test_debit_invalid_id_and_undecodable_body(client):
+    """Test an undecodable body gets FastAPI's 400 even with a bad path ID"""
+    response = client.post(
+        "/accounts/not-a-uuid/debit",
+        content=b"\xff",
+        headers={"content-type": "application/json"},
+    )
+
+    assert response.status_code == 400
+
+
+def test_credit_account_utf16_body(client):
+    """Test bodies json.loads accepts but pydantic-core does not still work"""
+    created = client.post(
+        "/accounts", json={"type": "checking", "initial_balance": 10.0}
+    ).json()
+
+    response = client.post(
+        f"/accounts/{created['account_id']}/credit",
+        content='{"amount": 2.5}'.encode("utf-16"),
+        headers={"content-type": "application/json"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["balance"] == 12.5
+
+
+def test_debit_account_negative_amount(client):
+    """Test a negative amount is still rejected by the service with 400"""
+    created = client.post(
+        "/accounts", json={"type": "checking", "initial_balance": 10.0}
+    ).json()
+
+    response = client.post(
+        f"/accounts/{created['account_id']}/debit", json={"amount": -1}
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"]["error_code"] == "INVALID_INPUT"
+
+
+@pytest.mark.parametrize(
+    "path, body",
+    [
+        ("/credit", b'{"amount": "inf"}'),
+        ("/credit", b'{"amount": NaN}'),
+        ("/debit", b'{"amount": -Infinity}'),
+        ("", b'{"type": "savings", "initial_balance": 1e999}'),
+    ],
+)
+def test_non_finite_amounts_rejected(client, path, body):
+    """Test non-finite amounts get a 422 and never reach the aggregates"""
+    created = client.post(
+        "/accounts", json={"type": "checking", "initial_balance": 10.0}
+    ).json()
+    url = f"/accounts/{created['account_id']}{path}" if path else "/accounts"
+
+    response = client.post(
+        url, content=body, headers={"content-type": "application/json"}
+    )
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "finite_number"
+    assert client.get("/accounts/aggregates").json()["total_balance"] == 10.0
+
+
+def test_ready_reports_draining_on_sigterm():
+    """Test /ready turns 503 when SIGTERM arrives, while requests are still served"""
+    passed_on = []
+    with TestClient(app) as client:
+        assert client.get("/ready").json() == "Accounts API is ready"
+
+        handle = drain_on_signal(
+            app, lambda signum, frame: passed_on.append(signum), delay=0
+        )
+        handle(signal.SIGTERM, None)
+
+        response = client.get("/ready")
+        assert response.status_code == 503
+        message = response.json()["detail"]["message"]
+        assert message == "Accounts API is not ready: draining"
+        assert client.get("/health").status_code == 200
+    assert passed_on == [signal.SIGTERM]
+
+
+def test_shutdown_delay_holds_back_sigterm():
+    """Test the signal reaches uvicorn only after the delay, unless repeated"""
+    passed_on = threading.Event()
+    draining_app = FastAPI()
+    draining_app.state.readiness = Readiness.READY
+    handle = drain_on_signal(
+        draining_app, lambda signum, frame: passed_on.set(), delay=0.05
+    )
+
+    handle(signal.SIGTERM, None)
+    assert draining_app.state.readiness is Readiness.DRAINING
+    assert not passed_on.is_set()
+    assert passed_on.wait(5)
+
+    passed_on.clear()
+    handle(signal.SIGTERM, None)
+    assert passed_on.is_set()
+
+
+def test_writes_rejected_while_draining(client):
+    """Test writes return 503 once the service has started draining"""
+    account = account_service.create_account(AccountType.CHECKING, 100.0)
+    account_service.drain(timeout=1.0)
+
+    response = client.post(
+        f"/accounts/{account.account_id}/credit", json={"amount": 10.0}
+    )
+
+    assert response.status_code == 503
+    assert response.json()["detail"]["error_code"] == "SERVICE_UNAVAILABLE"
+    assert client.get(f"/accounts/{account.account_id}").json()["balance"] == 100.0
+
+
+def test_accounts_survive_restart(tmp_path, monkeypatch):
+    """Test shutdown flushes accounts to the snapshot and startup loads them"""
+    settings = AccountSettings(snapshot_path=str(tmp_path / "accounts.snap"))
+    monkeypatch.setattr("accounts.main.get_account_settings", lambda: settings)
+
+    with TestClient(app) as client:
+        account_id = client.post(
+            "/accounts", json={"type": "savings", "initial_balance": 100.0}
+        ).json()["account_id"]
+        client.post(f"/accounts/{account_id}/credit", json={"amount": 25.0})
+    account_service.clear()
+
+    with TestClient(app) as client:
+        response = client.get(f"/accounts/{account_id}")
+        aggregates = client.get("/accounts/aggregates").json()
+
+    assert response.json()["balance"] == 125.0
+    assert aggregates["count"] == 1
+    assert aggregates["total_balance"] == 125.0
+
+
+def test_log_config_includes_service_loggers():
+    """Test the service's own log records go to uvicorn's console handler"""
+    config = log_config("warning")
+
+    assert config["loggers"]["accounts"]["handlers"] == ["default"]
+    assert config["loggers"]["accounts"]["level"] == logging.WARNING
+    assert "uvicorn.error" in config["loggers"]
@@ -0,0 +1,128 @@
+"""
+Tests for the serving profile configuration.
+"""
+
+import pytest
+
+from accounts.config import (
+    AccountSettings,
+    InterestSettings,
+    ServerSettings,
+    TracingSettings,
+)
+
+
+def test_defaults():
+    """Test defaults match the documented Kong-friendly profile"""
+    settings = ServerSettings.load(environ={})
+
+    assert settings.port == 8081
+    assert settings.keep_alive_timeout == 75
+    assert settings.limit_concurrency is None
+
+
+def test_env_overrides_config_file(tmp_path):
+    """Test environment variables take precedence over the config file"""
+    config_file = tmp_path / "serving.toml"
+    config_file.write_text('[server]\nport = 9000\nhttp = "h11"\nbacklog = 512\n')
+
+    settings = ServerSettings.load(
+        environ={"ACCOUNTS_PORT": "9100", "ACCOUNTS_LIMIT_CONCURRENCY": "100"},
+        config_file=str(config_file),
+    )
+
+    assert settings.port == 9100
+    assert settings.http == "h11"
+    assert settings.backlog == 512
+    assert settings.limit_concurrency == 100
+
+
+def test_uvicorn_kwargs():
+    """Test settings map onto uvicorn parameter names"""
+    kwargs = ServerSettings(keep_alive_timeout=30).uvicorn_kwargs()
+
+    assert kwargs["timeout_keep_alive"] == 30
+    assert "threadpool_size" not in kwargs
+
+
+@pytest.mark.parametrize(
+    "environ",
+    [
+        {"ACCOUNTS_LOOP": "trio"},
+        {"ACCOUNTS_PORT": "eighty"},
+        {"ACCOUNTS_WORKERS": "0"},
+        {"ACCOUNTS_WORKERS": "2"},
+        {"LOG_LEVEL": "INFO"},
+    ],
+)
+def test_invalid_settings(environ):
+    """Test invalid settings raise ValueError"""
+    with pytest.raises(ValueError):
+        ServerSettings.load(environ=environ)
+
+
+@pytest.mark.parametrize("annual_rate", ["-0.01", "inf", "nan"])
+def test_invalid_annual_rate(annual_rate):
+    """Test a negative or non-finite savings rate is rejected"""
+    with pytest.raises(ValueError):
+        InterestSettings.load(environ={"ACCOUNTS_SAVINGS_ANNUAL_RATE": annual_rate})
+
+
+@pytest.mark.parametrize(
+    "endpoint", ["localhost:4318/v1/traces", "ftp://collector/v1/traces", "http://"]
+)
+def test_invalid_export_endpoint(endpoint):
+    """Test a trace export endpoint must be an HTTP(S) URL"""
+    with pytest.raises(ValueError):
+        TracingSettings.load(environ={"ACCOUNTS_TRACE_EXPORT_ENDPOINT": endpoint})
+
+
+def test_export_endpoint():
+    """Test an HTTP(S) trace export endpoint is accepted"""
+    endpoint = "http://localhost:4318/v1/traces"
+
+    settings = TracingSettings.load(
+        environ={"ACCOUNTS_TRACE_EXPORT_ENDPOINT": endpoint}
+    )
+
+    assert settings.export_endpoint == endpoint
+
+
+def test_unknown_config_file_key(tmp_path):
+    """Test unknown keys in the config file are rejected"""
+    config_file = tmp_path / "serving.toml"
+    config_file.write_text("[server]\nthreads = 4\n")
+
+    with pytest.raises(ValueError) as excinfo:
+        ServerSettings.load(environ={}, config_file=str(config_file))
+
+    assert "threads" in str(excinfo.value)
+
+
+def test_account_settings_from_env():
+    """Test snapshot and drain settings are read from the environment"""
+    settings = AccountSettings.load(
+        environ={
+            "ACCOUNTS_SNAPSHOT_PATH": "/data/accounts.snap",
+            "ACCOUNTS_DRAIN_TIMEOUT": "2.5",
+        }
+    )
+
+    assert settings.snapshot_path == "/data/accounts.snap"
+    assert settings.drain_timeout == 2.5
+    assert AccountSettings.load(environ={}).snapshot_path is None
+
+
+def test_graceful_shutdown_timeout():
+    """Test the graceful shutdown timeout is passed to uvicorn"""
+    settings = ServerSettings.load(environ={"ACCOUNTS_GRACEFUL_SHUTDOWN_TIMEOUT": "45"})
+
+    assert settings.uvicorn_kwargs()["timeout_graceful_shutdown"] == 45
+
+
+def test_shutdown_delay():
+    """Test the shutdown delay is read but kept out of the uvicorn arguments"""
+    settings = ServerSettings.load(environ={"ACCOUNTS_SHUTDOWN_DELAY": "2.5"})
+
+    assert settings.shutdown_delay == 2.5
+    assert "shutdown_delay" not in settings.uvicorn_kwargs()
@@ -19,10 +19,10 @@ def client():
 def reset_account_service():
     """Reset the account service singleton between tests"""
     # Clear all accounts from the singleton service
-    account_service._accounts_db = {}
+    account_service.clear()
     yield
     # Clean up after test
-    account_service._accounts_db = {}
+    account_service.clear()
 
 
 @pytest.fixture
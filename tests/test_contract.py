@@ -0,0 +1,90 @@
+"""
+Tests for the contract-driven load harness.
+"""
+
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from accounts.main import app
+from accounts.services.account import account_service
+from benchmarks.contract_load import (
+    ContractLoadRunner,
+    load_operations,
+    load_spec,
+    validate,
+)
+
+SPEC_PATH = Path(__file__).resolve().parent.parent / "accounts-service.yaml"
+
+
+@pytest.fixture(scope="module")
+def spec():
+    """The OpenAPI document from the Insomnia export"""
+    return load_spec(str(SPEC_PATH))
+
+
+def test_loads_every_operation_with_budgets(spec):
+    """Test all operations are loaded with their weights and budgets"""
+    operations = {op.operation_id: op for op in load_operations(spec)}
+
+    assert {
+        "listAccounts",
+        "createAccount",
+        "getAccountById",
+        "debitAccount",
+        "creditAccount",
+        "healthCheck",
+    } <= set(operations)
+    debit = operations["debitAccount"]
+    assert debit.path_params == ["accountId"]
+    assert {"amount": 100} in debit.bodies
+    assert debit.latency_budget_ms is not None
+    assert debit.weight > 0
+
+
+def test_validate_against_component_schema(spec):
+    """Test schema validation through $ref, required, enum and uuid format"""
+    schema = {"$ref": "#/components/schemas/Account"}
+    valid = {
+        "account_id": "123e4567-e89b-12d3-a456-426614174000",
+        "type": "checking",
+        "balance": 10,
+    }
+
+    assert validate(valid, schema, spec) == []
+    assert validate({**valid, "account_id": "nope"}, schema, spec)
+    assert validate({**valid, "balance": "10"}, schema, spec)
+    error_schema = {"$ref": "#/components/schemas/ErrorResponse"}
+    assert validate({"error_code": "OOPS", "message": "x"}, error_schema, spec)
+    assert validate({"message": "x"}, error_schema, spec)
+
+
+def test_app_honours_contract_under_load(spec):
+    """Test a short concurrent run produces no contract violations"""
+    account_service.clear()
+    try:
+        with TestClient(app) as client:
+            runner = ContractLoadRunner(client, spec, load_operations(spec), 3)
+            runner.run(duration=0.5, concurrency=2)
+    finally:
+        account_service.clear()
+
+    rows = runner.report()
+    assert sum(row["requests"] for row in rows) > 0
+    assert [row["violations"] for row in rows if row["violations"]] == []
+
+
+def test_flags_undocumented_status(spec):
+    """Test a response with an undocumented status is a violation"""
+    operation = next(
+        op for op in load_operations(spec) if op.operation_id == "getAccountById"
+    )
+    runner = ContractLoadRunner(None, spec, [operation])
+
+    class Response:
+        status_code = 418
+        text = "teapot"
+
+    assert runner.check(operation, Response()) == ["undocumented status 418: teapot"]
@@ -0,0 +1,83 @@
+"""
+Tests for account ID generation and parsing.
+"""
+
+import uuid
+
+import pytest
+
+from accounts.api.models import AccountType
+from accounts.services.account import AccountService
+from accounts.services.ids import (
+    AccountIdGenerator,
+    format_account_id,
+    parse_account_id,
+)
+
+
+def test_generates_uuid4():
+    """Test pooled IDs are valid, unique version 4 UUIDs"""
+    generator = AccountIdGenerator(pool_size=3)
+
+    ids = [generator.new_id() for _ in range(10)]
+
+    assert len(set(ids)) == 10
+    for account_id in ids:
+        assert account_id.version == 4
+        assert account_id.variant == uuid.RFC_4122
+        assert uuid.UUID(str(account_id)) == account_id
+
+
+def test_generates_time_ordered_uuid7():
+    """Test time-ordered IDs are version 7 and strictly increasing"""
+    generator = AccountIdGenerator(time_ordered=True)
+
+    ids = [generator.new_id() for _ in range(5000)]
+
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    assert all(account_id.version == 7 for account_id in ids)
+    assert all(account_id.variant == uuid.RFC_4122 for account_id in ids)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "123e4567-e89b-12d3-a456-426614174000",
+        "123E4567-E89B-12D3-A456-426614174000",
+        "123e4567e89b12d3a456426614174000",
+        "{123e4567-e89b-12d3-a456-426614174000}",
+    ],
+)
+def test_parse_account_id(text):
+    """Test accepted spellings parse to the 16-byte form"""
+    expected = uuid.UUID("123e4567-e89b-12d3-a456-426614174000")
+
+    assert parse_account_id(text) == expected.bytes
+    assert format_account_id(parse_account_id(text)) == str(expected)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "not-a-uuid",
+        "123e4567-e89b-12d3-a456-42661417400g",
+        "1" * 8 + "-    " * 4 + "1" * 11,
+    ],
+)
+def test_parse_invalid_account_id(text):
+    """Test malformed IDs raise ValueError"""
+    with pytest.raises(ValueError):
+        parse_account_id(text)
+
+
+def test_service_lookup_by_bytes_or_uuid():
+    """Test accounts can be looked up by UUID or by 16-byte key"""
+    service = AccountService(AccountIdGenerator(time_ordered=True))
+    account = service.create_account(AccountType.CHECKING, 10.0)
+
+    assert account.account_id.version == 7
+    assert service.get_account(account.account_id) is not None
+    assert service.get_account(account.account_id.bytes) is not None
+    assert service.credit_account(account.account_id.bytes, 5.0).balance == 15.0
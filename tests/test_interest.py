@@ -0,0 +1,150 @@
+"""
+Tests for savings interest accrual.
+"""
+
+import uuid
+from datetime import date
+
+import pytest
+
+from accounts.api.models import AccountType
+from accounts.services import interest
+from accounts.services.account import AccountService
+from accounts.services.interest import (
+    RUN_HISTORY,
+    InterestAccrualEngine,
+    compute_interest,
+)
+
+
+@pytest.fixture
+def account_service():
+    """Create a fresh account service for testing"""
+    return AccountService()
+
+
+@pytest.fixture(params=["numpy", "array"])
+def backend(request, monkeypatch):
+    """Run each test with and without NumPy"""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(interest, "np", None)
+    return request.param
+
+
+def test_compute_interest(backend):
+    """Test interest is compounded daily and rounded to cents"""
+    amounts = compute_interest([36500.0, 100.0], annual_rate=0.05, days=1)
+
+    assert list(amounts) == [5.0, 0.01]
+
+
+def test_accrue_credits_savings_only(account_service, backend):
+    """Test accrual credits savings accounts and records the run"""
+    savings = account_service.create_account(AccountType.SAVINGS, 36500.0)
+    checking = account_service.create_account(AccountType.CHECKING, 36500.0)
+    engine = InterestAccrualEngine(account_service, annual_rate=0.05, chunk_size=1)
+
+    run = engine.accrue(as_of=date(2026, 1, 1))
+
+    assert account_service.get_account(savings.account_id).balance == 36505.0
+    assert account_service.get_account(checking.account_id).balance == 36500.0
+    assert run.count == 1
+    assert run.total == 5.0
+    assert run.amount_for(savings.account_id) == 5.0
+    assert run.amount_for(checking.account_id) is None
+    assert account_service.get_aggregates().total_balance == 73005.0
+
+
+def test_accrue_once_per_day(account_service, backend):
+    """Test a second run for the same day is a no-op and gaps are compounded"""
+    account_service.create_account(AccountType.SAVINGS, 36500.0)
+    engine = InterestAccrualEngine(account_service, annual_rate=0.05)
+
+    engine.accrue(as_of=date(2026, 1, 1))
+    assert engine.accrue(as_of=date(2026, 1, 1)) is None
+
+    run = engine.accrue(as_of=date(2026, 1, 3))
+    assert run.days == 2
+    assert len(engine.runs) == 2
+
+
+def test_run_history_is_bounded(account_service):
+    """Test only the most recent runs are kept"""
+    account_service.create_account(AccountType.SAVINGS, 100.0)
+    engine = InterestAccrualEngine(account_service, annual_rate=0.05)
+
+    for day in range(1, RUN_HISTORY + 3):
+        engine.accrue(as_of=date(2026, 1, day))
+
+    assert len(engine.runs) == RUN_HISTORY
+    assert engine.runs[-1].accrued_on == date(2026, 1, RUN_HISTORY + 2)
+
+
+def test_stopped_run_leaves_credits_pending(account_service, backend, monkeypatch):
+    """Test a run stopped between chunks is partial and resumed from its state"""
+    accounts = [
+        account_service.create_account(AccountType.SAVINGS, 36500.0) for _ in range(3)
+    ]
+    engine = InterestAccrualEngine(account_service, annual_rate=0.05, chunk_size=1)
+    credit_batch = account_service.credit_batch
+
+    def credit_then_stop(account_ids, amounts):
+        credit_batch(account_ids, amounts)
+        engine.stop()
+
+    monkeypatch.setattr(account_service, "credit_batch", credit_then_stop)
+    run = engine.accrue(as_of=date(2026, 1, 1))
+
+    assert (run.applied, run.count, run.complete) == (1, 3, False)
+    state = engine.state()
+    assert state.accrued_on == date(2026, 1, 1)
+    assert len(state.pending_amounts) == 2
+
+    monkeypatch.setattr(account_service, "credit_batch", credit_batch)
+    resumed = InterestAccrualEngine(account_service, annual_rate=0.05, state=state)
+
+    assert resumed.accrue(as_of=date(2026, 1, 1)) is None
+    balances = [account_service.get_account(a.account_id).balance for a in accounts]
+    assert balances == [36505.0] * 3
+    assert not resumed.state().pending_amounts
+
+
+def test_credit_batch_is_atomic(account_service):
+    """Test a batch with an unknown account applies no credits"""
+    account = account_service.create_account(AccountType.SAVINGS, 100.0)
+
+    with pytest.raises(KeyError):
+        account_service.credit_batch([account.account_id, uuid.uuid4()], [1.0, 1.0])
+
+    assert account_service.get_account(account.account_id).balance == 100.0
+
+
+def test_credit_batch_repeated_account(account_service):
+    """Test an account credited twice in one batch keeps both credits"""
+    account = account_service.create_account(AccountType.SAVINGS, 100.0)
+
+    account_service.credit_batch([account.account_id] * 2, [1.0, 2.0])
+
+    assert account_service.get_account(account.account_id).balance == 103.0
+    assert account_service.get_aggregates().total_balance == 103.0
+
+
+@pytest.mark.parametrize("amount", [-1.0, float("nan"), float("inf")])
+def test_credit_batch_invalid_amount(account_service, amount):
+    """Test a negative or non-finite amount rejects the whole batch"""
+    account = account_service.create_account(AccountType.SAVINGS, 100.0)
+
+    with pytest.raises(ValueError):
+        account_service.credit_batch([account.account_id] * 2, [1.0, amount])
+
+    assert account_service.get_account(account.account_id).balance == 100.0
+    assert account_service.get_aggregates().total_balance == 100.0
+
+
+@pytest.mark.parametrize("annual_rate", [-0.01, float("nan"), float("inf")])
+def test_invalid_rate(account_service, annual_rate):
+    """Test a negative or non-finite rate is rejected"""
+    with pytest.raises(ValueError):
+        InterestAccrualEngine(account_service, annual_rate=annual_rate)
@@ -2,13 +2,15 @@
 Tests for the Account Service logic.
 """
 
+import threading
+import time
 import uuid
 from uuid import UUID
 
 import pytest
 
 from accounts.api.models import AccountType
-from accounts.services.account import AccountService
+from accounts.services.account import AccountService, ServiceDrainingError
 
 
 @pytest.fixture
@@ -141,6 +143,22 @@ def test_credit_negative_amount(account_service):
     assert "positive" in str(excinfo.value)
 
 
+@pytest.mark.parametrize("amount", [float("inf"), float("-inf"), float("nan")])
+def test_non_finite_amounts_rejected(account_service, amount):
+    """Test non-finite amounts raise ValueError and leave the totals intact"""
+    account = account_service.create_account(
+        account_type=AccountType.CHECKING, initial_balance=100.0
+    )
+
+    for write in (account_service.credit_account, account_service.debit_account):
+        with pytest.raises(ValueError):
+            write(account.account_id, amount)
+    with pytest.raises(ValueError):
+        account_service.create_account(AccountType.SAVINGS, amount)
+
+    assert account_service.get_aggregates().total_balance == 100.0
+
+
 def test_debit_account(account_service):
     """Test debiting an account"""
     # Create an account first
@@ -215,3 +233,141 @@ def test_debit_negative_amount(account_service):
         account_service.debit_account(account.account_id, -50.0)
 
     assert "positive" in str(excinfo.value)
+
+
+def test_aggregates_track_writes(account_service):
+    """Test aggregates are maintained across create, credit and debit"""
+    checking = account_service.create_account(AccountType.CHECKING, 1000.0)
+    savings = account_service.create_account(AccountType.SAVINGS, 2000.0)
+    account_service.credit_account(savings.account_id, 500.0)
+    account_service.debit_account(checking.account_id, 250.0)
+
+    aggregates = account_service.get_aggregates()
+
+    assert aggregates.count == 2
+    assert aggregates.total_balance == 3250.0
+    assert aggregates.count_by_type[AccountType.CHECKING] == 1
+    assert aggregates.count_by_type[AccountType.SAVINGS] == 1
+    assert aggregates.balance_by_type[AccountType.CHECKING] == 750.0
+    assert aggregates.balance_by_type[AccountType.SAVINGS] == 2500.0
+
+
+def test_list_accounts_is_a_snapshot(account_service):
+    """Test a listing is not affected by writes made after it was taken"""
+    account = account_service.create_account(AccountType.CHECKING, 100.0)
+
+    snapshot = account_service.list_accounts()
+    account_service.credit_account(account.account_id, 50.0)
+    account_service.create_account(AccountType.SAVINGS, 10.0)
+
+    assert len(snapshot) == 1
+    assert snapshot[0].balance == 100.0
+    assert account_service.get_account(account.account_id).balance == 150.0
+
+
+def test_clear_resets_aggregates(account_service):
+    """Test clearing the service removes accounts and resets totals"""
+    account_service.create_account(AccountType.SAVINGS, 100.0)
+
+    account_service.clear()
+
+    assert account_service.list_accounts() == []
+    assert account_service.get_aggregates().total_balance == 0.0
+    assert account_service.get_aggregates().count_by_type[AccountType.SAVINGS] == 0
+
+
+def test_restore_round_trip(account_service):
+    """Test a restored service matches the one the snapshot was taken from"""
+    checking = account_service.create_account(AccountType.CHECKING, 100.0)
+    savings = account_service.create_account(AccountType.SAVINGS, 250.0)
+    account_service.credit_account(savings.account_id, 50.0)
+
+    restored = AccountService()
+    restored.restore(account_service.snapshot())
+
+    assert restored.get_account(checking.account_id) == checking
+    assert restored.get_account(savings.account_id).balance == 300.0
+    assert restored.get_aggregates() == account_service.get_aggregates()
+    assert sorted(a.account_id for a in restored.list_accounts()) == sorted(
+        [checking.account_id, savings.account_id]
+    )
+
+
+def test_restored_accounts_accept_writes(account_service):
+    """Test restored accounts can be updated before and after first being read"""
+    first = account_service.create_account(AccountType.CHECKING, 100.0)
+    second = account_service.create_account(AccountType.SAVINGS, 100.0)
+    restored = AccountService()
+    restored.restore(account_service.snapshot())
+
+    restored.debit_account(first.account_id, 40.0)
+    restored.get_account(second.account_id)
+    restored.credit_batch([first.account_id, second.account_id], [1.0, 2.0])
+
+    assert restored.get_account(first.account_id).balance == 61.0
+    assert restored.get_account(second.account_id).balance == 102.0
+    assert restored.get_aggregates().total_balance == 163.0
+
+    # Snapshots mix accounts already read with ones still untouched.
+    third = restored.create_account(AccountType.SAVINGS, 5.0)
+    again = AccountService()
+    again.restore(restored.snapshot())
+    assert again.get_aggregates().count == 3
+    assert again.get_account(first.account_id).balance == 61.0
+    assert again.get_account(third.account_id).balance == 5.0
+    assert again.get_account(uuid.uuid4()) is None
+
+
+def test_bulk_reads_of_restored_accounts(account_service):
+    """Test listings and per-type balances see each restored account once"""
+    checking = account_service.create_account(AccountType.CHECKING, 100.0)
+    savings = account_service.create_account(AccountType.SAVINGS, 200.0)
+    other = account_service.create_account(AccountType.SAVINGS, 300.0)
+    restored = AccountService()
+    restored.restore(account_service.snapshot())
+    restored.credit_account(savings.account_id, 5.0)
+
+    listed = {a.account_id: a.balance for a in restored.list_accounts()}
+    assert listed == {
+        checking.account_id: 100.0,
+        savings.account_id: 205.0,
+        other.account_id: 300.0,
+    }
+    assert sorted(restored.balances_of_type(AccountType.SAVINGS)) == sorted(
+        [(savings.account_id.bytes, 205.0), (other.account_id.bytes, 300.0)]
+    )
+    assert restored.get_aggregates().count == 3
+    # Bulk reads leave untouched rows in the snapshot columns.
+    assert len(restored._accounts_db) == 1
+
+
+def test_drain_refuses_new_writes(account_service):
+    """Test writes raise ServiceDrainingError once draining has started"""
+    account = account_service.create_account(AccountType.CHECKING, 100.0)
+
+    assert account_service.drain(timeout=1.0)
+
+    with pytest.raises(ServiceDrainingError):
+        account_service.credit_account(account.account_id, 10.0)
+    with pytest.raises(ServiceDrainingError):
+        account_service.create_account(AccountType.SAVINGS, 10.0)
+    assert account_service.get_account(account.account_id).balance == 100.0
+
+
+def test_drain_waits_for_in_flight_writes(account_service):
+    """Test drain returns once writes that already started have finished"""
+    account = account_service.create_account(AccountType.CHECKING, 100.0)
+    account_service._lock.acquire()
+    writer = threading.Thread(
+        target=account_service.credit_account, args=(account.account_id, 10.0)
+    )
+    writer.start()
+    while not account_service._writers:
+        time.sleep(0.001)
+
+    assert not account_service.drain(timeout=0.05)
+
+    account_service._lock.release()
+    writer.join()
+    assert account_service.drain(timeout=1.0)
+    assert account_service.get_account(account.account_id).balance == 110.0
@@ -0,0 +1,115 @@
+"""
+Tests for the binary account snapshot format.
+"""
+
+import struct
+import zlib
+from array import array
+from dataclasses import replace
+from datetime import date
+
+import pytest
+
+from accounts.api.models import AccountType
+from accounts.services.snapshot import (
+    MAGIC,
+    VERSION,
+    AccountSnapshot,
+    InterestState,
+    read_snapshot,
+    split_keys,
+    write_snapshot,
+)
+
+
+def make_snapshot():
+    """A small snapshot with one account of each type"""
+    return AccountSnapshot(
+        keys=bytes(range(16)) + bytes(range(16, 32)),
+        types=bytes([0, 1]),
+        balances=array("d", [12.5, 100.0]),
+        total_balance=112.5,
+        balance_by_type={AccountType.CHECKING: 12.5, AccountType.SAVINGS: 100.0},
+    )
+
+
+def test_round_trip(tmp_path):
+    """Test a written snapshot reads back unchanged"""
+    path = str(tmp_path / "accounts.snap")
+    snapshot = make_snapshot()
+
+    write_snapshot(snapshot, path)
+    loaded = read_snapshot(path)
+
+    assert loaded == snapshot
+    assert loaded.count_by_type() == {
+        AccountType.CHECKING: 1,
+        AccountType.SAVINGS: 1,
+    }
+    assert not (tmp_path / "accounts.snap.tmp").exists()
+
+
+def test_empty_snapshot(tmp_path):
+    """Test an empty store can be written and read"""
+    path = str(tmp_path / "accounts.snap")
+    snapshot = AccountSnapshot(b"", b"", array("d"), 0.0, {t: 0.0 for t in AccountType})
+
+    write_snapshot(snapshot, path)
+
+    assert read_snapshot(path).count == 0
+
+
+def test_interest_state_round_trip(tmp_path):
+    """Test the accrual day and pending interest credits are kept"""
+    path = str(tmp_path / "accounts.snap")
+    interest = InterestState(date(2026, 1, 2), bytes(range(16)), array("d", [0.5]))
+    snapshot = replace(make_snapshot(), interest=interest)
+
+    write_snapshot(snapshot, path)
+
+    assert read_snapshot(path).interest == interest
+    assert split_keys(interest.pending_keys) == [bytes(range(16))]
+
+
+def test_type_codes_follow_file_names(tmp_path):
+    """Test type codes are mapped by name when the file lists types differently"""
+    names = b"savings,checking"
+    header = b"".join(
+        [
+            struct.pack("<8sHQdH", MAGIC, VERSION, 1, 10.0, len(names)),
+            names,
+            struct.pack("<2d", 10.0, 0.0),
+            struct.pack("<IQ", 0, 0),
+        ]
+    )
+    body = header + bytes(16) + bytes([0]) + struct.pack("<d", 10.0)
+    path = tmp_path / "accounts.snap"
+    path.write_bytes(body + struct.pack("<I", zlib.crc32(body)))
+
+    loaded = read_snapshot(str(path))
+
+    assert loaded.count_by_type()[AccountType.SAVINGS] == 1
+    assert loaded.balance_by_type[AccountType.SAVINGS] == 10.0
+
+
+@pytest.mark.parametrize(
+    "corrupt, message",
+    [
+        (lambda data: b"NOTASNAP" + data[8:], "not an account snapshot"),
+        (lambda data: data[:-3], "truncated"),
+        # Cut inside the type names, then inside the per-type balances.
+        (lambda data: data[:36], "truncated"),
+        (lambda data: data[:50], "truncated"),
+        (lambda data: data[:-12] + b"\xff" + data[-11:], "checksum"),
+    ],
+)
+def test_corrupt_snapshot(tmp_path, corrupt, message):
+    """Test damaged files raise ValueError instead of loading bad state"""
+    path = tmp_path / "accounts.snap"
+    write_snapshot(make_snapshot(), str(path))
+    path.write_bytes(corrupt(path.read_bytes()))
+
+    with pytest.raises(ValueError) as excinfo:
+        read_snapshot(str(path))
+
+    assert message in str(excinfo.value)
@@ -0,0 +1,144 @@
+"""
+Tests for request tracing.
+"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from accounts.api.models import AccountType
+from accounts.main import app
+from accounts.services.account import account_service
+from accounts.tracing import (
+    PeriodicExporter,
+    Tracer,
+    parse_traceparent,
+    span,
+    to_otlp_json,
+    tracer,
+)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+@pytest.fixture
+def client():
+    """Test client with tracing reset between tests"""
+    tracer.configure(sample_ratio=0.0, buffer_size=128)
+    account_service.clear()
+    yield TestClient(app)
+    tracer.configure(sample_ratio=0.0, buffer_size=128)
+    account_service.clear()
+
+
+def test_parse_traceparent():
+    """Test valid and invalid traceparent headers"""
+    assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01") == (
+        TRACE_ID,
+        PARENT_ID,
+        True,
+    )
+    assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-00")[2] is False
+    assert parse_traceparent(f"00-{'0' * 32}-{PARENT_ID}-01") is None
+    assert parse_traceparent("not-a-traceparent") is None
+
+
+def test_span_is_noop_outside_a_sampled_request():
+    """Test span() records nothing when there is no sampled parent"""
+    with span("outside") as s:
+        s.set_attribute("key", "value")
+
+    assert tracer.drain() == []
+
+
+def test_sampled_request_records_spans(client):
+    """Test a sampled traceparent produces route, validation and service spans"""
+    account = account_service.create_account(AccountType.CHECKING, 100.0)
+
+    response = client.post(
+        f"/accounts/{account.account_id}/credit",
+        json={"amount": 50.0},
+        headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"},
+    )
+
+    assert response.status_code == 200
+    spans = {s.name: s for s in tracer.drain()}
+    server = spans["POST /accounts/{account_id}/credit"]
+    assert server.trace_id == TRACE_ID
+    assert server.parent_id == PARENT_ID
+    assert server.attributes["http.response.status_code"] == 200
+    route = spans["route creditAccount"]
+    assert route.parent_id == server.span_id
+    assert spans["validate"].parent_id == route.span_id
+    service = spans["AccountService.credit_account"]
+    assert service.parent_id == route.span_id
+    assert "lock.wait_ns" in service.attributes
+
+
+def test_unsampled_request_records_nothing(client):
+    """Test requests are not traced when the caller did not sample them"""
+    client.get("/accounts", headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-00"})
+    client.get("/accounts")
+
+    assert tracer.drain() == []
+
+
+def test_sample_ratio(client):
+    """Test requests without a traceparent are sampled by ratio"""
+    tracer.configure(sample_ratio=1.0, buffer_size=128)
+
+    client.get("/accounts")
+
+    names = [s.name for s in tracer.drain()]
+    assert "GET /accounts" in names
+    assert "AccountService.list_accounts" in names
+
+
+def test_export_to_file(client, tmp_path):
+    """Test spans are exported as OTLP/JSON lines"""
+    tracer.configure(sample_ratio=1.0, buffer_size=128)
+    client.get("/accounts")
+    path = tmp_path / "spans.json"
+
+    exported = tracer.export_to_file(str(path))
+
+    payload = json.loads(path.read_text().splitlines()[0])
+    spans = payload["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert len(spans) == exported
+    assert {"traceId", "spanId", "startTimeUnixNano", "endTimeUnixNano"} <= set(
+        spans[0]
+    )
+    assert tracer.drain() == []
+
+
+def test_exporter_survives_failed_export():
+    """Test a failed export is logged, not raised, so later exports still run"""
+    local = Tracer()
+    local.configure(sample_ratio=1.0, buffer_size=8)
+    local.start_span("op").end()
+    # No scheme: urllib rejects it with ValueError rather than OSError.
+    exporter = PeriodicExporter(local, 60.0, endpoint="localhost:4318/v1/traces")
+
+    exporter.flush()
+
+    assert local.drain() == []
+
+
+def test_otlp_attribute_types():
+    """Test attribute values are encoded with OTLP value types"""
+    tracer.configure(sample_ratio=0.0, buffer_size=8)
+    s = tracer.start_span("op", attributes={"n": 1, "ok": True, "x": 0.5, "s": "v"})
+    s.end()
+
+    attributes = to_otlp_json(tracer.drain())["resourceSpans"][0]["scopeSpans"][0][
+        "spans"
+    ][0]["attributes"]
+
+    assert {a["key"]: a["value"] for a in attributes} == {
+        "n": {"intValue": "1"},
+        "ok": {"boolValue": True},
+        "x": {"doubleValue": 0.5},
+        "s": {"stringValue": "v"},
+    }